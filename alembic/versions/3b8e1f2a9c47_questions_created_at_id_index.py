@@ -0,0 +1,25 @@
+"""Questions created_at id index
+
+Revision ID: 3b8e1f2a9c47
+Revises: f69254853498
+Create Date: 2026-10-17 10:12:04.418233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e1f2a9c47'
+down_revision = 'f69254853498'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Индекс для keyset-пагинации списка вопросов по (created_at, id)
+    op.create_index('ix_questions_created_at_id', 'questions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_created_at_id', table_name='questions')
@@ -0,0 +1,29 @@
+"""Drop redundant id indexes
+
+Revision ID: 5f0d2b7e8c14
+Revises: e3a9b6c41f27
+Create Date: 2026-10-17 19:20:45.882610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f0d2b7e8c14'
+down_revision = 'e3a9b6c41f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Внешний ключ answers.question_id покрыт ведущей колонкой
+    # ix_answers_question_id_created_at_id (7d2c4e9a1b63) - отдельный индекс не нужен.
+    # ix_questions_id и ix_answers_id дублируют первичные ключи
+    op.drop_index('ix_questions_id', table_name='questions')
+    op.drop_index('ix_answers_id', table_name='answers')
+
+
+def downgrade() -> None:
+    op.create_index('ix_answers_id', 'answers', ['id'], unique=False)
+    op.create_index('ix_questions_id', 'questions', ['id'], unique=False)
@@ -0,0 +1,30 @@
+"""Answers question_id created_at index
+
+Revision ID: 7d2c4e9a1b63
+Revises: 3b8e1f2a9c47
+Create Date: 2026-10-17 11:03:27.512904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2c4e9a1b63'
+down_revision = '3b8e1f2a9c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Индекс для окна ответов вопроса, упорядоченного по (created_at, id)
+    op.create_index(
+        'ix_answers_question_id_created_at_id',
+        'answers',
+        ['question_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answers_question_id_created_at_id', table_name='answers')
@@ -0,0 +1,38 @@
+"""Questions deleted_at
+
+Revision ID: 9c4d1e7b2a58
+Revises: 5f0d2b7e8c14
+Create Date: 2026-10-17 20:05:12.418330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4d1e7b2a58'
+down_revision = '5f0d2b7e8c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Отметка удаления вопроса: ответы очищаются фоновой задачей порциями
+    op.add_column(
+        'questions',
+        sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    # Частичный индекс для поиска недочищенных вопросов
+    op.create_index(
+        'ix_questions_deleted_at',
+        'questions',
+        ['deleted_at'],
+        unique=False,
+        postgresql_where=sa.text('deleted_at IS NOT NULL'),
+        sqlite_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_deleted_at', table_name='questions')
+    op.drop_column('questions', 'deleted_at')
@@ -0,0 +1,80 @@
+"""Full text search
+
+Revision ID: a4f7c2d81e05
+Revises: 7d2c4e9a1b63
+Create Date: 2026-10-17 14:21:08.903117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f7c2d81e05'
+down_revision = '7d2c4e9a1b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # FTS5-таблицы (rowid = ID строки), синхронизируемые триггерами
+        op.execute("CREATE VIRTUAL TABLE questions_fts USING fts5(text)")
+        op.execute(
+            "CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN "
+            "INSERT INTO questions_fts(rowid, text) VALUES (new.id, new.text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN "
+            "DELETE FROM questions_fts WHERE rowid = old.id; END"
+        )
+        op.execute("INSERT INTO questions_fts(rowid, text) SELECT id, text FROM questions")
+
+        op.execute("CREATE VIRTUAL TABLE answers_fts USING fts5(text, question_id UNINDEXED)")
+        op.execute(
+            "CREATE TRIGGER answers_fts_insert AFTER INSERT ON answers BEGIN "
+            "INSERT INTO answers_fts(rowid, text, question_id) "
+            "VALUES (new.id, new.text, new.question_id); END"
+        )
+        op.execute(
+            "CREATE TRIGGER answers_fts_delete AFTER DELETE ON answers BEGIN "
+            "DELETE FROM answers_fts WHERE rowid = old.id; END"
+        )
+        op.execute(
+            "INSERT INTO answers_fts(rowid, text, question_id) "
+            "SELECT id, text, question_id FROM answers"
+        )
+        return
+
+    # Генерируемые tsvector-колонки с GIN-индексами
+    for table in ('questions', 'answers'):
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('simple', text)) STORED"
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            unique=False,
+            postgresql_using='gin'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        # Триггеры ссылаются на FTS-таблицы: без них любая вставка упадет
+        for trigger in (
+            'questions_fts_insert',
+            'questions_fts_delete',
+            'answers_fts_insert',
+            'answers_fts_delete',
+        ):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS answers_fts")
+        op.execute("DROP TABLE IF EXISTS questions_fts")
+        return
+
+    for table in ('answers', 'questions'):
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
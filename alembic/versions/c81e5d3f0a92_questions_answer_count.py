@@ -0,0 +1,35 @@
+"""Questions answer_count
+
+Revision ID: c81e5d3f0a92
+Revises: a4f7c2d81e05
+Create Date: 2026-10-17 14:02:37.215904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e5d3f0a92'
+down_revision = 'a4f7c2d81e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Денормализованное число ответов вопроса
+    op.add_column(
+        'questions',
+        sa.Column('answer_count', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.execute(
+        "UPDATE questions SET answer_count = "
+        "(SELECT count(*) FROM answers WHERE answers.question_id = questions.id)"
+    )
+    # Индекс для keyset-пагинации списка вопросов по (answer_count, id)
+    op.create_index('ix_questions_answer_count_id', 'questions', ['answer_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_answer_count_id', table_name='questions')
+    op.drop_column('questions', 'answer_count')
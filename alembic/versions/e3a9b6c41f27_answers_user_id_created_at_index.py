@@ -0,0 +1,30 @@
+"""Answers user_id created_at id index
+
+Revision ID: e3a9b6c41f27
+Revises: c81e5d3f0a92
+Create Date: 2026-10-17 18:41:12.530117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9b6c41f27'
+down_revision = 'c81e5d3f0a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Индекс для keyset-пагинации ответов пользователя по (user_id, created_at, id)
+    op.create_index(
+        'ix_answers_user_id_created_at_id',
+        'answers',
+        ['user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_answers_user_id_created_at_id', table_name='answers')
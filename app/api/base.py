@@ -1,6 +1,12 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
 from app.utils.config import settings
+from app.core.admission import admission_controller
+from app.core.cache import entity_cache
+from app.core.compression import compressed_cache
+from app.core.database import get_pool_stats
+from app.core.metrics import registry
 from app.core.schemas import StandardResponse
 
 # Базовый роутер для общих endpoints
@@ -24,6 +30,30 @@ def health_check():
     """Проверка здоровья приложения"""
     return StandardResponse(
         message="Service is healthy",
-        data={"status": "healthy"}
+        data={
+            "status": "healthy",
+            "entity_cache": entity_cache.stats(),
+            "compression_cache": compressed_cache.stats(),
+            "db_pool": get_pool_stats(),
+            "admission": admission_controller.stats() if admission_controller is not None else None
+        }
     )
 
+
+def metrics():
+    """Метрики в текстовом формате Prometheus"""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+# При выключенных метриках endpoint не регистрируется (404)
+if settings.metrics_enabled:
+    base_router.add_api_route(
+        "/metrics",
+        metrics,
+        methods=["GET"],
+        response_class=PlainTextResponse,
+        include_in_schema=False
+    )
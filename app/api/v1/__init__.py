@@ -9,4 +9,5 @@ api_router = APIRouter(prefix="/api/v1")
 api_router.include_router(questions.router)
 api_router.include_router(answers.answer_create_router)
 api_router.include_router(answers.answers_router)
+api_router.include_router(answers.user_answers_router)
 
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, Body, Depends, Path, Query, Request, status
 
-from app.core.dependencies import get_answer_service
-from app.core.schemas import StandardResponse
+from app.core.dependencies import get_answer_service, get_read_answer_service
+from app.core.etag import not_modified
+from app.core.schemas import BatchResultSchema, PaginatedResponse, StandardResponse
+from app.core.serialization import envelope
 from app.domains.answers.schemas import AnswerCreateSchema, AnswerResponseSchema
 from app.domains.answers.service import AnswerService
+from app.utils.config import settings
 
 # Роутер для создания ответов (с префиксом /questions)
 answer_create_router = APIRouter(prefix="/questions", tags=["answers"])
@@ -11,6 +15,9 @@ answer_create_router = APIRouter(prefix="/questions", tags=["answers"])
 # Роутер для получения и удаления ответов (без префикса)
 answers_router = APIRouter(prefix="/answers", tags=["answers"])
 
+# Роутер для истории ответов пользователя (с префиксом /users)
+user_answers_router = APIRouter(prefix="/users", tags=["answers"])
+
 
 @answer_create_router.post(
     "/{question_id}/answers/",
@@ -24,9 +31,29 @@ async def create_answer(
 ):
     """Добавить ответ к вопросу"""
     answer = await answer_service.create_answer(question_id, answer_data)
-    return StandardResponse(
-        message="Answer created successfully",
-        data=answer
+    return envelope(
+        "Answer created successfully",
+        answer,
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@answer_create_router.post(
+    "/{question_id}/answers/batch",
+    response_model=StandardResponse[BatchResultSchema[AnswerResponseSchema]],
+    status_code=status.HTTP_201_CREATED
+)
+async def create_answers_batch(
+    question_id: int,
+    items: List[Any] = Body(..., description="Список ответов (AnswerCreateSchema)"),
+    answer_service: AnswerService = Depends(get_answer_service)
+):
+    """Добавить пачку ответов к вопросу одним запросом к БД"""
+    result = await answer_service.create_answers_batch(question_id, items)
+    return envelope(
+        "Answers batch processed",
+        result,
+        status_code=status.HTTP_201_CREATED
     )
 
 
@@ -36,14 +63,21 @@ async def create_answer(
     status_code=status.HTTP_200_OK
 )
 async def get_answer(
+    request: Request,
     answer_id: int,
-    answer_service: AnswerService = Depends(get_answer_service)
+    answer_service: AnswerService = Depends(get_read_answer_service)
 ):
     """Получить конкретный ответ"""
+    etag = await answer_service.get_answer_etag(answer_id)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
     answer = await answer_service.get_answer_by_id(answer_id)
-    return StandardResponse(
-        message="Answer retrieved successfully",
-        data=answer
+    return envelope(
+        "Answer retrieved successfully",
+        answer,
+        headers={"ETag": etag}
     )
 
 
@@ -58,7 +92,27 @@ async def delete_answer(
 ):
     """Удалить ответ"""
     await answer_service.delete_answer(answer_id)
-    return StandardResponse(
-        message="Answer deleted successfully",
-        data={"id": answer_id}
+    return envelope(
+        "Answer deleted successfully",
+        {"id": answer_id}
+    )
+
+
+@user_answers_router.get(
+    "/{user_id}/answers",
+    response_model=PaginatedResponse[AnswerResponseSchema],
+    status_code=status.HTTP_200_OK
+)
+async def get_user_answers(
+    user_id: int = Path(..., gt=0),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    answer_service: AnswerService = Depends(get_read_answer_service)
+):
+    """Получить страницу ответов пользователя (от новых к старым)"""
+    answers, next_cursor = await answer_service.get_user_answers(user_id, limit, cursor)
+    return envelope(
+        "User answers retrieved successfully",
+        answers,
+        next_cursor=next_cursor
     )
@@ -1,31 +1,55 @@
-from typing import List
-from fastapi import APIRouter, Depends, status
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
-from app.core.dependencies import get_question_service
-from app.core.schemas import StandardResponse
+from app.core.cache import EntityCache, get_entity_cache
+from app.core.database import get_session_factory
+
+from app.core.dependencies import get_question_service, get_read_question_service
+from app.core.etag import not_modified
+from app.core.schemas import BatchResultSchema, PaginatedResponse, StandardResponse
+from app.core.serialization import envelope
 from app.domains.questions.schemas import (
+    ExportFormat,
     QuestionCreateSchema,
     QuestionResponseSchema,
+    QuestionSearchResultSchema,
+    QuestionSort,
     QuestionWithAnswersSchema
 )
-from app.domains.questions.service import QuestionService
+from app.domains.questions.service import QuestionService, purge_deleted_question, stream_questions_export
+from app.utils.config import settings
 
 router = APIRouter(prefix="/questions", tags=["questions"])
 
 
 @router.get(
     "/",
-    response_model=StandardResponse[List[QuestionResponseSchema]],
+    response_model=PaginatedResponse[QuestionResponseSchema],
     status_code=status.HTTP_200_OK
 )
 async def get_questions(
-    question_service: QuestionService = Depends(get_question_service)
+    request: Request,
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    sort: QuestionSort = Query(QuestionSort.created_at, description="Поле сортировки (по убыванию)"),
+    question_service: QuestionService = Depends(get_read_question_service)
 ):
-    """Получить список всех вопросов"""
-    questions = await question_service.get_all_questions()
-    return StandardResponse(
-        message="Questions retrieved successfully",
-        data=questions
+    """Получить страницу вопросов (по убыванию даты создания или числа ответов)"""
+    # Без If-None-Match ETag считается по уже загруженной странице - без лишнего запроса
+    if request.headers.get("if-none-match"):
+        etag = await question_service.get_questions_etag(limit, cursor, sort)
+        cached = not_modified(request, etag)
+        if cached is not None:
+            return cached
+
+    questions, next_cursor, etag = await question_service.get_all_questions(limit, cursor, sort)
+    return envelope(
+        "Questions retrieved successfully",
+        questions,
+        headers={"ETag": etag},
+        next_cursor=next_cursor
     )
 
 
@@ -40,9 +64,70 @@ async def create_question(
 ):
     """Создать новый вопрос"""
     question = await question_service.create_question(question_data)
-    return StandardResponse(
-        message="Question created successfully",
-        data=question
+    return envelope(
+        "Question created successfully",
+        question,
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.post(
+    "/batch",
+    response_model=StandardResponse[BatchResultSchema[QuestionResponseSchema]],
+    status_code=status.HTTP_201_CREATED
+)
+async def create_questions_batch(
+    items: List[Any] = Body(..., description="Список вопросов (QuestionCreateSchema)"),
+    question_service: QuestionService = Depends(get_question_service)
+):
+    """Создать пачку вопросов одним запросом к БД"""
+    result = await question_service.create_questions_batch(items)
+    return envelope(
+        "Questions batch processed",
+        result,
+        status_code=status.HTTP_201_CREATED
+    )
+
+
+@router.get(
+    "/search",
+    response_model=PaginatedResponse[QuestionSearchResultSchema],
+    status_code=status.HTTP_200_OK
+)
+async def search_questions(
+    q: str = Query(..., min_length=1, max_length=200, description="Поисковый запрос"),
+    limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    question_service: QuestionService = Depends(get_question_service)
+):
+    """Полнотекстовый поиск по вопросам и ответам (от более релевантных)"""
+    questions, next_cursor = await question_service.search_questions(q, limit, cursor)
+    return envelope(
+        "Questions found successfully",
+        questions,
+        next_cursor=next_cursor
+    )
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+@router.get("/export", status_code=status.HTTP_200_OK)
+async def export_questions(
+    format: ExportFormat = Query(ExportFormat.ndjson, description="Формат выгрузки"),
+    include_answers: bool = Query(False, description="Включить ответы"),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+):
+    """Потоковая выгрузка всех вопросов (и ответов) в NDJSON или CSV"""
+    return StreamingResponse(
+        stream_questions_export(session_factory, format, include_answers),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="questions.{format.value}"'
+        }
     )
 
 
@@ -52,29 +137,60 @@ async def create_question(
     status_code=status.HTTP_200_OK
 )
 async def get_question(
+    request: Request,
     question_id: int,
-    question_service: QuestionService = Depends(get_question_service)
+    answers_limit: int = Query(settings.default_page_size, ge=1, le=settings.max_page_size),
+    answers_cursor: Optional[str] = Query(None, description="Курсор следующего окна ответов"),
+    question_service: QuestionService = Depends(get_read_question_service)
 ):
-    """Получить вопрос и все ответы на него"""
-    question = await question_service.get_question_by_id(question_id)
-    return StandardResponse(
-        message="Question retrieved successfully",
-        data=question
+    """Получить вопрос и окно ответов на него (от старых к новым)"""
+    etag = await question_service.get_question_etag(question_id, answers_limit, answers_cursor)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    question = await question_service.get_question_by_id(
+        question_id, answers_limit, answers_cursor
+    )
+    return envelope(
+        "Question retrieved successfully",
+        question,
+        headers={"ETag": etag}
     )
 
 
 @router.delete(
     "/{question_id}",
     response_model=StandardResponse[dict],
-    status_code=status.HTTP_200_OK
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_202_ACCEPTED: {
+            "model": StandardResponse[dict],
+            "description": "Question marked deleted, answers are purged in background"
+        }
+    }
 )
 async def delete_question(
     question_id: int,
-    question_service: QuestionService = Depends(get_question_service)
+    background_tasks: BackgroundTasks,
+    question_service: QuestionService = Depends(get_question_service),
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    cache: Optional[EntityCache] = Depends(get_entity_cache)
 ):
-    """Удалить вопрос (вместе с ответами)"""
-    await question_service.delete_question(question_id)
-    return StandardResponse(
-        message="Question deleted successfully",
-        data={"id": question_id}
+    """
+    Удалить вопрос (вместе с ответами)
+
+    Вопрос с большим числом ответов сразу становится недоступен,
+    а ответы удаляются в фоне порциями - в этом случае ответ 202.
+    """
+    if await question_service.delete_question(question_id):
+        background_tasks.add_task(purge_deleted_question, session_factory, cache, question_id)
+        return envelope(
+            "Question deletion scheduled",
+            {"id": question_id},
+            status_code=status.HTTP_202_ACCEPTED
+        )
+    return envelope(
+        "Question deleted successfully",
+        {"id": question_id}
     )
@@ -0,0 +1,145 @@
+"""
+Служебные команды приложения
+
+Запуск:
+    python -m app.cli repair-answer-counts
+    python -m app.cli load-dataset --questions 100000 --answers 1000000 --seed 42
+    python -m app.cli audit-queries --row-threshold 1000
+    python -m app.cli purge-deleted-questions --chunk-size 1000
+"""
+import argparse
+import asyncio
+import sys
+from typing import List
+
+from app.core.database import AsyncSessionLocal, engine
+from app.core.query_audit import ScanFinding, audit_queries
+from app.domains.answers.model import Answer  # noqa
+from app.domains.questions.repository import QuestionRepository
+from app.utils.config import settings
+from app.utils.dataset import DatasetSpec, LoadStats, load_dataset
+from app.utils.logger import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+
+async def repair_answer_counts() -> int:
+    """Пересчитать answer_count всех вопросов по таблице answers"""
+    async with AsyncSessionLocal() as session:
+        repaired = await QuestionRepository(session).recompute_answer_counts()
+    await engine.dispose()
+    return repaired
+
+
+async def load_synthetic_dataset(spec: DatasetSpec, chunk_size: int) -> List[LoadStats]:
+    """Загрузить синтетический набор данных в БД из настроек"""
+    try:
+        return await load_dataset(engine, spec, chunk_size)
+    finally:
+        await engine.dispose()
+
+
+async def audit_repository_queries(row_threshold: int) -> List[ScanFinding]:
+    """Проверить планы запросов репозиториев на БД из настроек"""
+    try:
+        return await audit_queries(engine, row_threshold)
+    finally:
+        await engine.dispose()
+
+
+async def purge_deleted_questions(chunk_size: int) -> int:
+    """Дочистить вопросы, отмеченные на удаление (например, после рестарта)"""
+    try:
+        async with AsyncSessionLocal() as session:
+            repository = QuestionRepository(session)
+            question_ids = await repository.get_marked_deleted_ids()
+            for question_id in question_ids:
+                await repository.purge_deleted(question_id, chunk_size)
+        return len(question_ids)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "repair-answer-counts",
+        help="Пересчитать денормализованный answer_count вопросов"
+    )
+    load = commands.add_parser(
+        "load-dataset",
+        help="Сгенерировать синтетические вопросы и ответы и загрузить их в БД"
+    )
+    load.add_argument("--questions", type=int, default=100000, help="Число вопросов")
+    load.add_argument("--answers", type=int, default=1000000, help="Число ответов")
+    load.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    load.add_argument(
+        "--skew", type=float, default=1.2,
+        help="Показатель Парето для ответов на вопрос (меньше - сильнее перекос)"
+    )
+    load.add_argument("--users", type=int, default=10000, help="Число различных user_id")
+    load.add_argument(
+        "--answer-length-median", type=int, default=300, help="Медиана длины ответа"
+    )
+    load.add_argument(
+        "--answer-length-sigma", type=float, default=1.0,
+        help="Sigma логнормального распределения длины ответа"
+    )
+    load.add_argument("--chunk-size", type=int, default=10000, help="Строк в одной порции")
+    audit = commands.add_parser(
+        "audit-queries",
+        help="EXPLAIN для запросов репозиториев: найти последовательные сканирования"
+    )
+    audit.add_argument(
+        "--row-threshold", type=int, default=1000,
+        help="Сканирования таблиц не больше этого числа строк не считаются"
+    )
+    purge = commands.add_parser(
+        "purge-deleted-questions",
+        help="Удалить порциями ответы и сами вопросы, отмеченные на удаление"
+    )
+    purge.add_argument(
+        "--chunk-size", type=int, default=settings.question_purge_chunk_size,
+        help="Ответов в одной транзакции"
+    )
+    args = parser.parse_args()
+
+    setup_logging(settings.log_level, settings.log_json)
+    if args.command == "repair-answer-counts":
+        repaired = asyncio.run(repair_answer_counts())
+        print(f"Исправлено вопросов: {repaired}")
+    elif args.command == "load-dataset":
+        spec = DatasetSpec(
+            questions=args.questions,
+            answers=args.answers,
+            seed=args.seed,
+            skew=args.skew,
+            users=args.users,
+            answer_length_median=args.answer_length_median,
+            answer_length_sigma=args.answer_length_sigma
+        )
+        for item in asyncio.run(load_synthetic_dataset(spec, args.chunk_size)):
+            print(
+                f"{item.table:>10}: {item.rows} строк за {item.seconds:.2f} с "
+                f"({item.rows_per_second:.0f} строк/с)"
+            )
+    elif args.command == "audit-queries":
+        findings = asyncio.run(audit_repository_queries(args.row_threshold))
+        unexpected = [finding for finding in findings if not finding.expected]
+        for finding in findings:
+            mark = "ожидаемо" if finding.expected else "ПРОБЛЕМА"
+            print(
+                f"[{mark}] {finding.operation}: {finding.detail} "
+                f"({finding.table}: {finding.rows} строк)\n    {finding.statement}"
+            )
+        print(f"Последовательных сканирований: {len(findings)}, из них неожиданных: {len(unexpected)}")
+        if unexpected:
+            sys.exit(1)
+    elif args.command == "purge-deleted-questions":
+        purged = asyncio.run(purge_deleted_questions(args.chunk_size))
+        print(f"Очищено вопросов: {purged}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Контроль допуска запросов перед пулом соединений БД
+
+Одновременно обрабатывается не больше limit запросов (по умолчанию - размер
+пула с overflow), остальные ждут в ограниченной очереди. Запрос, которому
+не хватило места в очереди или который не дождался слота, сразу получает
+503, а не висит в ожидании соединения до таймаута клиента. Дополнительно
+можно ограничить частоту запросов каждого клиента (token bucket) - 429.
+"""
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional
+
+from app.core.metrics import registry
+from app.utils.config import settings
+
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total",
+    "Requests shed by admission control by reason",
+    ("reason",)
+)
+
+
+class AdmissionController:
+    """Ограничение числа одновременных запросов с ограниченной очередью ожидания"""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        """
+        Args:
+            limit: Максимальное число одновременно обрабатываемых запросов
+            queue_size: Максимальное число запросов, ожидающих слота
+            queue_timeout: Максимальное ожидание слота в очереди, с
+        """
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Занять слот обработки
+
+        Returns:
+            None, если слот занят, иначе причина отказа: "queue_full" или "queue_timeout"
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.queue_size:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # Освободившийся слот передается ожидающему без изменения active
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return None
+        except asyncio.TimeoutError:
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передан, но запрос отменен - возвращаем слот
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self) -> None:
+        """Освободить слот: передать его первому ожидающему или вернуть"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Статистика для /health"""
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "queue_size": self.queue_size,
+        }
+
+
+class TokenBucket:
+    """Ведро токенов: rate токенов в секунду, не больше capacity"""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """
+        Взять токен
+
+        Returns:
+            0, если токен взят, иначе секунды до появления токена
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class ClientRateLimiter:
+    """Ведра токенов по клиентам с вытеснением давно не обращавшихся (LRU)"""
+
+    def __init__(self, rate: float, burst: int, max_clients: int):
+        """
+        Args:
+            rate: Запросов в секунду на клиента
+            burst: Максимальный всплеск запросов клиента
+            max_clients: Максимальное число отслеживаемых клиентов
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client: str) -> float:
+        """
+        Учесть запрос клиента
+
+        Returns:
+            0, если запрос разрешен, иначе секунды до следующего разрешенного
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst, now)
+            self._buckets[client] = bucket
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.take(now)
+
+
+def concurrency_limit() -> int:
+    """
+    Лимит одновременных запросов: из настроек или суммарный размер пулов
+
+    Запрос держит соединение либо primary, либо одной из реплик, поэтому
+    без явного лимита он равен сумме пулов (pool_size + max_overflow) всех движков.
+
+    Raises:
+        ValueError: Лимит не задан в режиме PgBouncer (пула в приложении нет)
+    """
+    if settings.admission_concurrency_limit:
+        return settings.admission_concurrency_limit
+    if settings.db_pgbouncer_mode:
+        raise ValueError("ADMISSION_CONCURRENCY_LIMIT is required in PgBouncer mode")
+    engines = 1 + len(settings.database_replica_urls)
+    return (settings.db_pool_size + settings.db_max_overflow) * engines
+
+
+admission_controller: Optional[AdmissionController] = (
+    AdmissionController(
+        limit=concurrency_limit(),
+        queue_size=settings.admission_queue_size,
+        queue_timeout=settings.admission_queue_timeout
+    )
+    if settings.admission_enabled else None
+)
+
+client_rate_limiter: Optional[ClientRateLimiter] = (
+    ClientRateLimiter(
+        rate=settings.rate_limit_per_client,
+        burst=settings.rate_limit_burst,
+        max_clients=settings.rate_limit_max_clients
+    )
+    if settings.rate_limit_per_client > 0 else None
+)
+
+registry.gauge(
+    "admission_active",
+    "Requests currently admitted",
+    lambda: admission_controller.active if admission_controller is not None else 0
+)
+registry.gauge(
+    "admission_queued",
+    "Requests waiting for admission",
+    lambda: admission_controller.queued if admission_controller is not None else 0
+)
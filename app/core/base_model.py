@@ -1,23 +1,36 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import Column, Integer, DateTime
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
 
+def utcnow() -> datetime:
+    """Текущее время UTC для значений по умолчанию на стороне приложения"""
+    return datetime.now(timezone.utc)
+
+
 class BaseModel(Base):
     """Базовый класс для всех моделей с общими полями"""
 
     __abstract__ = True
 
     id = Column(Integer, primary_key=True)
+    # Значения задаются приложением: в SQLite они хранятся в том же формате,
+    # что и параметры курсоров keyset-пагинации, и строковое сравнение
+    # (created_at, id) < (:created_at, :id) корректно. server_default остается
+    # для строк, вставленных в обход приложения
     created_at = Column(
         DateTime(timezone=True),
+        default=utcnow,
         server_default=func.now(),
         nullable=False
     )
     updated_at = Column(
         DateTime(timezone=True),
+        default=utcnow,
         server_default=func.now(),
-        onupdate=func.now(),
+        onupdate=utcnow,
         nullable=False
     )
@@ -1,8 +1,13 @@
-from typing import Optional, TypeVar, Generic, Type
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, TypeVar, Generic, Tuple, Type
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import Delete, Select, select, delete, insert, inspect
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import DeclarativeBase
 
+from app.core.cache import EntityCache
+from app.core.invalidation import publish_clear, publish_invalidation
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,24 +15,168 @@ logger = get_logger(__name__)
 # Тип для модели
 ModelType = TypeVar("ModelType", bound=DeclarativeBase)
 
+# Ключ сущности в кэше: (имя таблицы, ID)
+CacheKey = Tuple[str, int]
+
+# Сбрасываемый ключ: (имя таблицы, ID, версия строки после изменения).
+# Версия - entity_version(updated_at), None - строка удалена или версия неизвестна
+StaleKey = Tuple[str, int, Optional[float]]
+
+# Запросы, к которым применяется ограничение видимости
+StatementType = TypeVar("StatementType", Select, Delete)
+
+# SQLSTATE нарушения внешнего ключа в PostgreSQL
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def entity_version(updated_at: datetime) -> float:
+    """Версия строки для кэша: updated_at в секундах (SQLite возвращает время без зоны - это UTC)"""
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at.timestamp()
+
+
+def is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """Проверить, вызвана ли ошибка целостности нарушением внешнего ключа"""
+    sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    if sqlstate is not None:
+        return sqlstate == FOREIGN_KEY_VIOLATION
+    # SQLite не сообщает SQLSTATE
+    return "FOREIGN KEY constraint failed" in str(exc.orig)
+
 
 class BaseRepository(Generic[ModelType]):
     """Базовый репозиторий с общими методами для работы с БД"""
 
-    def __init__(self, db: AsyncSession, model: Type[ModelType]):
+    def __init__(
+        self,
+        db: AsyncSession,
+        model: Type[ModelType],
+        cache: Optional[EntityCache] = None
+    ):
         """
         Инициализация репозитория
 
         Args:
             db: Асинхронная сессия БД
             model: Класс модели SQLAlchemy
+            cache: Кэш сущностей (None - читать всегда из БД)
         """
         self.db = db
         self.model = model
+        self.cache = cache
+
+    def _cache_key(self, entity_id: int) -> CacheKey:
+        """Ключ сущности в кэше"""
+        return self.model.__tablename__, entity_id
+
+    def _cache_entity(self, entity: ModelType, loaded_at: Optional[float] = None) -> None:
+        """
+        Сохранить значения колонок сущности в кэш
+
+        Args:
+            entity: Сущность
+            loaded_at: Начало чтения сущности из БД по time.monotonic()
+                (None - сущность только что записана этим запросом)
+        """
+        # Отстающая реплика могла вернуть уже удаленную или устаревшую строку:
+        # кэш общий для всех клиентов, поэтому он заполняется только с primary
+        if self.cache is None or self.db.info.get("replica"):
+            return
+        values = {
+            attr.key: getattr(entity, attr.key)
+            for attr in inspect(self.model).column_attrs
+        }
+        self.cache.set(
+            self._cache_key(entity.id),
+            values,
+            loaded_at=loaded_at,
+            version=entity_version(entity.updated_at)
+        )
+
+    def _invalidate(self, entity_id: int) -> None:
+        """Удалить сущность из кэша"""
+        self._invalidate_keys([(*self._cache_key(entity_id), None)])
+
+    async def insert_one(self, values: Dict[str, Any]) -> ModelType:
+        """
+        Создать сущность одним запросом INSERT ... RETURNING
+
+        Args:
+            values: Значения колонок
+
+        Returns:
+            Созданная сущность со всеми колонками, заполненными БД
+        """
+        entities = await self.insert_many([values])
+        return entities[0]
+
+    async def insert_many(self, rows: Sequence[Dict[str, Any]]) -> List[ModelType]:
+        """
+        Создать сущности одним многострочным запросом INSERT ... RETURNING
+
+        Args:
+            rows: Значения колонок для каждой сущности
+
+        Returns:
+            Созданные сущности в порядке входных данных
+        """
+        if not rows:
+            return []
+        try:
+            result = await self.db.scalars(
+                insert(self.model).values(list(rows)).returning(self.model)
+            )
+            # Порядок строк RETURNING не гарантирован - ID выдаются по порядку вставки
+            entities = sorted(result.all(), key=lambda entity: entity.id)
+            stale_keys = await self._after_insert(entities)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        self._invalidate_keys(stale_keys)
+        for entity in entities:
+            self._cache_entity(entity)
+        return entities
+
+    async def _after_insert(self, entities: List[ModelType]) -> List[StaleKey]:
+        """
+        Хук: выполняется в транзакции вставки до commit
+
+        Returns:
+            Ключи кэша связанных сущностей, которые нужно сбросить после commit
+        """
+        return []
+
+    async def _after_delete(self, entity: ModelType) -> List[StaleKey]:
+        """
+        Хук: выполняется в транзакции удаления до commit
+
+        Returns:
+            Ключи кэша связанных сущностей, которые нужно сбросить после commit
+        """
+        return []
+
+    def _invalidate_keys(self, keys: Sequence[StaleKey]) -> None:
+        """Удалить из кэша связанные сущности (здесь и в других воркерах)"""
+        if self.cache is not None:
+            for table, entity_id, version in keys:
+                self.cache.invalidate((table, entity_id), version)
+            publish_invalidation(keys)
+
+    def _clear_cache(self) -> None:
+        """Очистить кэш целиком (здесь и в других воркерах)"""
+        if self.cache is not None:
+            self.cache.clear()
+            publish_clear()
+
+    def _visible(self, query: StatementType) -> StatementType:
+        """Хук: ограничить запрос видимыми сущностями (например, без удаленных)"""
+        return query
 
     async def get_by_id(self, entity_id: int) -> Optional[ModelType]:
         """
-        Получить сущность по ID
+        Получить сущность по ID (сначала из кэша, затем из БД)
 
         Args:
             entity_id: ID сущности
@@ -35,9 +184,38 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             Сущность или None, если не найдена
         """
-        logger.info(f"Получение {self.model.__name__} с ID: {entity_id}")
+        if self.cache is not None:
+            values = self.cache.get(self._cache_key(entity_id))
+            if values is not None:
+                return self.model(**values)
+
+        logger.info("Получение %s с ID: %s", self.model.__name__, entity_id)
+        loaded_at = time.monotonic()
+        result = await self.db.execute(
+            self._visible(select(self.model).filter(self.model.id == entity_id))
+        )
+        entity = result.scalar_one_or_none()
+        if entity is not None:
+            self._cache_entity(entity, loaded_at)
+        return entity
+
+    async def get_version(self, entity_id: int) -> Optional[datetime]:
+        """
+        Получить updated_at сущности без загрузки всей строки
+
+        Args:
+            entity_id: ID сущности
+
+        Returns:
+            Время последнего изменения или None, если сущность не найдена
+        """
+        if self.cache is not None:
+            values = self.cache.get(self._cache_key(entity_id))
+            if values is not None:
+                return values["updated_at"]
+
         result = await self.db.execute(
-            select(self.model).filter(self.model.id == entity_id)
+            self._visible(select(self.model.updated_at).filter(self.model.id == entity_id))
         )
         return result.scalar_one_or_none()
 
@@ -51,23 +229,27 @@ class BaseRepository(Generic[ModelType]):
         Returns:
             True если удалено, False если не найдено
         """
-        logger.info(f"Удаление {self.model.__name__} с ID: {entity_id}")
+        logger.info("Удаление %s с ID: %s", self.model.__name__, entity_id)
         try:
             # Удаляем через statement для надежности с async сессиями
-            result = await self.db.execute(
-                delete(self.model).where(self.model.id == entity_id)
+            result = await self.db.scalars(
+                self._visible(delete(self.model).where(self.model.id == entity_id))
+                .returning(self.model)
             )
+            deleted = result.one_or_none()
+            stale_keys = await self._after_delete(deleted) if deleted is not None else []
             await self.db.commit()
-            if result.rowcount > 0:
-                logger.info(f"{self.model.__name__} с ID {entity_id} удален")
+            self._invalidate(entity_id)
+            self._invalidate_keys(stale_keys)
+            if deleted is not None:
+                logger.info("%s с ID %s удален", self.model.__name__, entity_id)
                 return True
             else:
-                logger.warning(f"{self.model.__name__} с ID {entity_id} не найден")
+                logger.warning("%s с ID %s не найден", self.model.__name__, entity_id)
                 return False
         except Exception as e:
             await self.db.rollback()
             logger.error(
-                f"Ошибка при удалении {self.model.__name__} "
-                f"с ID {entity_id}: {str(e)}"
+                "Ошибка при удалении %s с ID %s: %s", self.model.__name__, entity_id, e
             )
             raise
@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from app.core.metrics import registry
+from app.utils.config import settings
+
+
+class EntityCache:
+    """
+    Внутрипроцессный кэш сущностей с вытеснением по LRU и TTL
+
+    Хранит значения колонок строк, а не ORM-объекты, чтобы не удерживать
+    объекты, привязанные к сессиям разных запросов.
+
+    Сброшенные ключи запоминаются на время TTL вместе с версией новой строки:
+    загрузка, начатая до сброса, попадет в кэш, только если прочитала строку
+    не старше этой версии. Так медленный запрос, прочитавший строку до
+    изменения, не вернет в кэш устаревшее значение после сброса.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Инициализация кэша
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Optional[float]]]" = OrderedDict()
+        # Ключ -> (время сброса по time.monotonic(), версия новой строки или None)
+        self._invalidated: "OrderedDict[Hashable, Tuple[float, Optional[float]]]" = OrderedDict()
+        self._cleared_at = float("-inf")
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Получить значение по ключу или None, если его нет или оно устарело"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        loaded_at: Optional[float] = None,
+        version: Optional[float] = None
+    ) -> bool:
+        """
+        Сохранить значение, вытеснив самую давно использованную запись
+
+        Args:
+            key: Ключ
+            value: Значение
+            loaded_at: Начало загрузки значения по time.monotonic() (None - значение заведомо актуально)
+            version: Версия значения (updated_at строки)
+
+        Returns:
+            False, если значение загружено до сброса ключа и старше его версии
+            или в кэше уже более новая версия
+        """
+        if loaded_at is not None and self._is_stale(key, loaded_at, version):
+            return False
+        current = self._entries.get(key)
+        if current is not None and version is not None and current[2] is not None and current[2] > version:
+            return False
+        self._entries[key] = (time.monotonic() + self.ttl, value, version)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return True
+
+    def _is_stale(self, key: Hashable, loaded_at: float, version: Optional[float]) -> bool:
+        """Загрузка начата до сброса ключа (или всего кэша) и не видит новую версию"""
+        if loaded_at <= self._cleared_at:
+            return True
+        invalidation = self._invalidated.get(key)
+        if invalidation is None:
+            return False
+        invalidated_at, new_version = invalidation
+        if invalidated_at + self.ttl <= time.monotonic() or loaded_at > invalidated_at:
+            return False
+        return new_version is None or version is None or version < new_version
+
+    def invalidate(self, key: Hashable, version: Optional[float] = None) -> None:
+        """
+        Удалить значение по ключу
+
+        Args:
+            key: Ключ
+            version: Версия строки после изменения (None - строка удалена или версия неизвестна)
+        """
+        entry = self._entries.get(key)
+        if entry is not None and version is not None and entry[2] is not None and entry[2] >= version:
+            # Сообщение пришло позже, чем в кэш попала уже новая версия
+            return
+        self._entries.pop(key, None)
+        now = time.monotonic()
+        self._invalidated[key] = (now, version)
+        self._invalidated.move_to_end(key)
+        while self._invalidated:
+            oldest_key, (invalidated_at, _) = next(iter(self._invalidated.items()))
+            if invalidated_at + self.ttl > now and len(self._invalidated) <= self.maxsize:
+                break
+            del self._invalidated[oldest_key]
+
+    def clear(self) -> None:
+        """Очистить кэш и счетчики"""
+        self._entries.clear()
+        self._invalidated.clear()
+        self._cleared_at = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+entity_cache = EntityCache(
+    maxsize=settings.entity_cache_maxsize,
+    ttl=settings.entity_cache_ttl
+)
+
+registry.gauge("entity_cache_hits", "Entity cache hits", lambda: entity_cache.hits)
+registry.gauge("entity_cache_misses", "Entity cache misses", lambda: entity_cache.misses)
+registry.gauge("entity_cache_size", "Entity cache entries", lambda: entity_cache.stats()["size"])
+
+
+def get_entity_cache() -> Optional[EntityCache]:
+    """Dependency для получения кэша сущностей (None, если кэш отключен)"""
+    return entity_cache if settings.entity_cache_enabled else None
@@ -0,0 +1,130 @@
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.cache import EntityCache
+from app.core.metrics import registry
+from app.utils.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+# Предпочтение сервера при равных q-значениях в Accept-Encoding
+PREFERRED_ENCODINGS: Tuple[str, ...] = (("br",) if brotli is not None else ()) + ("gzip", "deflate")
+
+# Типы содержимого, которые имеет смысл сжимать
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/",
+)
+
+# wbits zlib: 31 - формат gzip, 15 - формат zlib (HTTP deflate)
+_WBITS = {"gzip": 31, "deflate": 15}
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Выбрать кодировку сжатия по заголовку Accept-Encoding
+
+    Args:
+        accept_encoding: Значение заголовка Accept-Encoding
+
+    Returns:
+        Кодировка из PREFERRED_ENCODINGS с наибольшим q или None
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        weights[name.strip().lower()] = quality
+
+    wildcard = weights.get("*", 0.0)
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in PREFERRED_ENCODINGS:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Стоит ли сжимать содержимое такого типа"""
+    return bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, level: int = settings.compression_level) -> bytes:
+    """Сжать тело ответа целиком"""
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 11))
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+
+class StreamCompressor:
+    """Потоковое сжатие тела ответа по частям"""
+
+    def __init__(self, encoding: str, level: int = settings.compression_level):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=min(level, 11))
+            self._process: Callable[[bytes], bytes] = compressor.process
+            self._flush: Callable[[], bytes] = compressor.flush
+            self._finish: Callable[[], bytes] = compressor.finish
+        else:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+            self._process = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Сжать очередную часть и отдать все, что готово к отправке"""
+        return self._process(chunk) + self._flush()
+
+    def finish(self) -> bytes:
+        """Завершить поток"""
+        return self._finish()
+
+
+# Уже сжатые тела ответов по (кодировка, путь, ETag)
+compressed_cache = EntityCache(
+    maxsize=settings.compression_cache_maxsize,
+    ttl=settings.compression_cache_ttl
+)
+
+registry.gauge("compression_cache_hits", "Compressed body cache hits", lambda: compressed_cache.hits)
+registry.gauge(
+    "compression_cache_misses", "Compressed body cache misses", lambda: compressed_cache.misses
+)
+
+
+def compressed_body(body: bytes, encoding: str, cache_key: Optional[Tuple] = None) -> bytes:
+    """
+    Сжатое тело ответа, из кэша для уже встречавшейся версии ресурса
+
+    Args:
+        body: Несжатое тело
+        encoding: Кодировка сжатия
+        cache_key: Ключ версии ресурса (путь и ETag) или None - не кэшировать
+
+    Returns:
+        Сжатое тело
+    """
+    if cache_key is None:
+        return compress(body, encoding)
+    key = (encoding,) + cache_key
+    cached: Optional[bytes] = compressed_cache.get(key)
+    if cached is not None:
+        return cached
+    compressed = compress(body, encoding)
+    compressed_cache.set(key, compressed)
+    return compressed
@@ -1,29 +1,260 @@
+import itertools
+import time
+from typing import Any, AsyncGenerator, Callable, Dict, Optional, Sequence
+from uuid import uuid4
+
+from fastapi import Depends, Request
+from sqlalchemy import event, exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_STATEMENT_DURATION, registry
 from app.utils.config import settings
 
-# Преобразуем postgresql:// в postgresql+asyncpg://
-database_url = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
+# Cookie с временем последней записи клиента (read-your-writes)
+LAST_WRITE_COOKIE = "last_write"
+
+
+def async_database_url(url: str) -> str:
+    """Преобразовать postgresql:// в postgresql+asyncpg://"""
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+database_url = async_database_url(settings.database_url)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который считает время ожидания выдачи соединения"""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time_total += waited
+            self.wait_time_max = max(self.wait_time_max, waited)
+            DB_POOL_CHECKOUT_WAIT.observe(waited)
+
+    def recreate(self) -> "InstrumentedPool":
+        pool = super().recreate()
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        pool.wait_time_total = self.wait_time_total
+        pool.wait_time_max = self.wait_time_max
+        return pool
+
+
+def engine_options(url: str = database_url) -> Dict[str, Any]:
+    """Параметры create_async_engine из настроек пула и драйвера"""
+    connect_args: Dict[str, Any] = {}
+    if url.startswith("postgresql+asyncpg://"):
+        if settings.db_pgbouncer_mode:
+            # PgBouncer в режиме transaction не сохраняет prepared statements
+            # между транзакциями: отключаем кэши и делаем имена уникальными
+            connect_args = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        else:
+            connect_args = {
+                "prepared_statement_cache_size": settings.db_statement_cache_size,
+            }
+
+    if settings.db_pgbouncer_mode:
+        # Пулом соединений управляет PgBouncer
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
 
 engine = create_async_engine(
     database_url,
     echo=False,
-    future=True
+    future=True,
+    **engine_options()
 )
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False
-)
+def make_sessionmaker(bind, replica: bool = False) -> async_sessionmaker:
+    """
+    Фабрика сессий с общими для приложения параметрами
+
+    Args:
+        bind: Движок
+        replica: Движок - реплика; сессии отмечаются в info["replica"]
+    """
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+        info={"replica": replica}
+    )
+
+
+AsyncSessionLocal = make_sessionmaker(engine)
+
+# Движки реплик только для чтения
+replica_engines = [
+    create_async_engine(
+        async_database_url(url),
+        echo=False,
+        future=True,
+        **engine_options(async_database_url(url))
+    )
+    for url in settings.database_replica_urls
+]
 
 Base = declarative_base()
 
 
+class ReplicaRouter:
+    """
+    Выбор фабрики сессий для чтения: реплики по кругу либо primary
+
+    Клиент, недавно выполнивший запись, читает с primary, чтобы увидеть
+    свои изменения несмотря на задержку репликации.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[async_sessionmaker] = (),
+        read_your_writes_window: float = 0.0
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.read_your_writes_window = read_your_writes_window
+        self._next_replica = itertools.cycle(self.replicas) if self.replicas else None
+
+    def recently_wrote(self, last_write: Optional[float]) -> bool:
+        """Попадает ли запись клиента в окно read-your-writes"""
+        if last_write is None or self.read_your_writes_window <= 0:
+            return False
+        return time.time() - last_write < self.read_your_writes_window
+
+    def for_read(self, last_write: Optional[float] = None) -> async_sessionmaker:
+        """
+        Фабрика сессий для чтения
+
+        Args:
+            last_write: Время последней записи клиента (Unix time) или None
+
+        Returns:
+            Фабрика сессий реплики, либо primary, если реплик нет
+            или клиент недавно писал
+        """
+        if self._next_replica is None or self.recently_wrote(last_write):
+            return self.primary
+        return next(self._next_replica)
+
+
+replica_router = ReplicaRouter(
+    AsyncSessionLocal,
+    [make_sessionmaker(replica_engine, replica=True) for replica_engine in replica_engines],
+    settings.read_your_writes_window
+)
+
+
+# Типы запросов, различаемые в метриках (остальные - other)
+STATEMENT_TYPES = {"select", "insert", "update", "delete"}
+
+
+def instrument_engine(sync_engine) -> None:
+    """Подключить замер длительности SQL-запросов к движку"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        verb = statement.lstrip()[:6].lower()
+        if verb not in STATEMENT_TYPES:
+            verb = "other"
+        DB_STATEMENT_DURATION.observe(time.perf_counter() - started, verb)
+
+
+def enable_sqlite_foreign_keys(sync_engine) -> None:
+    """
+    Включить проверку внешних ключей на каждом соединении SQLite
+
+    SQLite по умолчанию игнорирует FOREIGN KEY и ON DELETE CASCADE, а удаление
+    вопроса полагается на каскадное удаление ответов в БД.
+    """
+    if sync_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys = ON")
+        cursor.close()
+
+
+for _engine in [engine, *replica_engines]:
+    instrument_engine(_engine.sync_engine)
+    enable_sqlite_foreign_keys(_engine.sync_engine)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Статистика пула соединений основного движка"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, InstrumentedPool):
+        return {"pool": type(pool).__name__}
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "wait_time_total": round(pool.wait_time_total, 6),
+        "wait_time_max": round(pool.wait_time_max, 6),
+        "wait_time_avg": round(pool.wait_time_total / pool.checkouts, 6) if pool.checkouts else 0.0,
+    }
+
+
+def _pool_gauge(key: str) -> Callable[[], float]:
+    return lambda: float(get_pool_stats().get(key, 0))
+
+
+registry.gauge("db_pool_size", "Configured pool size", _pool_gauge("size"))
+registry.gauge("db_pool_checked_out", "Connections currently checked out", _pool_gauge("checked_out"))
+registry.gauge("db_pool_overflow", "Overflow connections currently open", _pool_gauge("overflow"))
+registry.gauge("db_pool_timeouts", "Pool checkout timeouts since start", _pool_gauge("timeouts"))
+
+
+def get_session_factory() -> async_sessionmaker:
+    """Dependency: фабрика сессий для фоновых задач, переживающих запрос"""
+    return AsyncSessionLocal
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency для получения async сессии БД"""
     async with AsyncSessionLocal() as session:
@@ -31,3 +262,31 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Dependency: маршрутизатор чтения между primary и репликами"""
+    return replica_router
+
+
+def last_write_time(request: Request) -> Optional[float]:
+    """Время последней записи клиента из cookie (None, если нет или повреждено)"""
+    value = request.cookies.get(LAST_WRITE_COOKIE)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+async def get_read_db(
+    request: Request,
+    router: ReplicaRouter = Depends(get_replica_router)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для получения async сессии только для чтения (реплика или primary)"""
+    async with router.for_read(last_write_time(request))() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,21 +1,49 @@
+from typing import Optional
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import EntityCache, get_entity_cache
+from app.core.database import get_db, get_read_db
 from app.domains.questions.repository import QuestionRepository
 from app.domains.questions.service import QuestionService
+from app.core.single_flight import SingleFlight, get_question_reads
+from app.core.write_batcher import WriteBatcher
+from app.domains.answers.batcher import answer_write_batcher
 from app.domains.answers.repository import AnswerRepository
 from app.domains.answers.service import AnswerService
+from app.utils.config import settings
 
 
-def get_question_repository(db: AsyncSession = Depends(get_db)) -> QuestionRepository:
+def get_question_repository(
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[EntityCache] = Depends(get_entity_cache)
+) -> QuestionRepository:
     """Dependency для получения репозитория вопросов"""
-    return QuestionRepository(db)
+    return QuestionRepository(db, cache)
 
 
-def get_answer_repository(db: AsyncSession = Depends(get_db)) -> AnswerRepository:
+def get_answer_repository(
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[EntityCache] = Depends(get_entity_cache)
+) -> AnswerRepository:
     """Dependency для получения репозитория ответов"""
-    return AnswerRepository(db)
+    return AnswerRepository(db, cache)
+
+
+def get_read_question_repository(
+    db: AsyncSession = Depends(get_read_db),
+    cache: Optional[EntityCache] = Depends(get_entity_cache)
+) -> QuestionRepository:
+    """Dependency для получения репозитория вопросов только для чтения (реплика)"""
+    return QuestionRepository(db, cache)
+
+
+def get_read_answer_repository(
+    db: AsyncSession = Depends(get_read_db),
+    cache: Optional[EntityCache] = Depends(get_entity_cache)
+) -> AnswerRepository:
+    """Dependency для получения репозитория ответов только для чтения (реплика)"""
+    return AnswerRepository(db, cache)
 
 
 def get_question_service(
@@ -25,8 +53,29 @@ def get_question_service(
     return QuestionService(repository)
 
 
+def get_answer_write_batcher() -> Optional[WriteBatcher]:
+    """Dependency: накопитель групповой записи ответов (None, если отключен)"""
+    return answer_write_batcher if settings.answer_write_batching_enabled else None
+
+
 def get_answer_service(
-    repository: AnswerRepository = Depends(get_answer_repository)
+    repository: AnswerRepository = Depends(get_answer_repository),
+    write_batcher: Optional[WriteBatcher] = Depends(get_answer_write_batcher)
 ) -> AnswerService:
     """Dependency для получения сервиса ответов"""
+    return AnswerService(repository, write_batcher)
+
+
+def get_read_question_service(
+    repository: QuestionRepository = Depends(get_read_question_repository),
+    reads: Optional[SingleFlight] = Depends(get_question_reads)
+) -> QuestionService:
+    """Dependency для получения сервиса вопросов только для чтения"""
+    return QuestionService(repository, reads)
+
+
+def get_read_answer_service(
+    repository: AnswerRepository = Depends(get_read_answer_repository)
+) -> AnswerService:
+    """Dependency для получения сервиса ответов только для чтения"""
     return AnswerService(repository)
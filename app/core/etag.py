@@ -0,0 +1,56 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Построить ETag из значений-валидаторов ресурса
+
+    Args:
+        parts: Значения, изменение которых меняет представление ресурса
+
+    Returns:
+        Сильный ETag в кавычках
+    """
+    raw = "|".join(repr(part) for part in parts).encode()
+    return f'"{hashlib.blake2b(raw, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверить, совпадает ли ETag с заголовком If-None-Match
+
+    Args:
+        if_none_match: Значение заголовка If-None-Match
+        etag: Текущий ETag ресурса
+
+    Returns:
+        True, если клиент уже имеет актуальное представление
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # Для GET допускается слабое сравнение
+        if candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """
+    Вернуть пустой ответ 304, если у клиента актуальная версия ресурса
+
+    Args:
+        request: Входящий запрос
+        etag: Текущий ETag ресурса (None, если ресурс не найден)
+
+    Returns:
+        Ответ 304 или None, если ресурс нужно отдать целиком
+    """
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
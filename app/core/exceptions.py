@@ -1,23 +1,21 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
 
-from app.core.schemas import StandardResponse
+from app.core.serialization import FastJSONResponse, envelope
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: Request, exc: HTTPException) -> FastJSONResponse:
     """Обработчик HTTPException - оборачивает в StandardResponse"""
-    return JSONResponse(
+    return envelope(
+        exc.detail,
+        None,
         status_code=exc.status_code,
-        content=StandardResponse(
-            message=exc.detail,
-            data=None
-        ).model_dump()
+        headers=getattr(exc, "headers", None)
     )
 
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> FastJSONResponse:
     """Обработчик ошибок валидации - оборачивает в StandardResponse"""
     errors = exc.errors()
     error_messages = []
@@ -27,10 +25,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     
     message = "Validation error: " + "; ".join(error_messages)
     
-    return JSONResponse(
-        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content=StandardResponse(
-            message=message,
-            data={"errors": errors}
-        ).model_dump()
+    return envelope(
+        message,
+        {"errors": errors},
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
     )
@@ -0,0 +1,306 @@
+"""
+Шина инвалидации кэша между процессами (воркерами uvicorn)
+
+Кэш сущностей живет в памяти каждого воркера. После commit репозиторий
+сбрасывает ключи в своем кэше и публикует их в шину, а остальные воркеры
+сбрасывают те же ключи у себя. Транспорты:
+
+- unix: датаграммные UNIX-сокеты в общем каталоге (воркеры одного хоста);
+- postgres: LISTEN/NOTIFY через отдельное соединение asyncpg.
+
+Окно устаревания ограничено сверху TTL кэша (в том числе при потере шины),
+фактическая задержка доставки - метрика cache_invalidation_lag_seconds.
+"""
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import os
+import socket
+import time
+import uuid
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.cache import EntityCache, entity_cache
+from app.core.metrics import registry
+from app.utils.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Сброшенный ключ (имя таблицы, ID, версия строки или None), как app.core.base_repository.StaleKey
+Key = Tuple[str, int, Optional[float]]
+
+# Ключей в одном сообщении: NOTIFY ограничивает payload 8000 байтами
+KEYS_PER_MESSAGE = 200
+
+INVALIDATION_MESSAGES = registry.counter(
+    "cache_invalidation_messages_total",
+    "Cache invalidation messages by direction (sent, received)",
+    ("direction",)
+)
+INVALIDATION_LAG = registry.histogram(
+    "cache_invalidation_lag_seconds",
+    "Delay between publishing an invalidation and applying it in another worker",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+)
+
+
+class InvalidationTransport(ABC):
+    """Транспорт сообщений шины: рассылка всем воркерам, кроме отправителя"""
+
+    @abstractmethod
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        """Начать прием сообщений"""
+
+    @abstractmethod
+    def send(self, payload: bytes) -> None:
+        """Отправить сообщение, не дожидаясь доставки"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Прекратить прием и освободить ресурсы"""
+
+
+class UnixSocketTransport(InvalidationTransport):
+    """
+    Датаграммные UNIX-сокеты: каждый воркер слушает <directory>/<name>.sock
+    (по умолчанию name - PID) и отправляет сообщение в сокеты остальных
+    воркеров каталога
+    """
+
+    def __init__(self, directory: str, name: Optional[str] = None):
+        self.directory = directory
+        self.path = os.path.join(directory, f"{name or os.getpid()}.sock")
+        self._socket: Optional[socket.socket] = None
+
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._socket.bind(self.path)
+
+        def read() -> None:
+            while True:
+                try:
+                    payload = self._socket.recv(65536)
+                except BlockingIOError:
+                    return
+                on_message(payload)
+
+        asyncio.get_running_loop().add_reader(self._socket.fileno(), read)
+
+    def send(self, payload: bytes) -> None:
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".sock") or entry.path == self.path:
+                continue
+            try:
+                self._socket.sendto(payload, entry.path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Воркер завершился, не удалив сокет
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                # Очередь получателя переполнена: его кэш догонит TTL
+                logger.warning("Сообщение инвалидации не доставлено в %s", entry.path)
+
+    async def close(self) -> None:
+        if self._socket is None:
+            return
+        asyncio.get_running_loop().remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class PostgresNotifyTransport(InvalidationTransport):
+    """
+    PostgreSQL LISTEN/NOTIFY через отдельное соединение asyncpg вне пула
+
+    При обрыве соединения сообщения могут быть потеряны, поэтому кэш
+    очищается целиком, а соединение восстанавливается в фоне.
+    """
+
+    def __init__(self, dsn: str, channel: str, cache: EntityCache, reconnect_delay: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.cache = cache
+        self.reconnect_delay = reconnect_delay
+        self._connection = None
+        self._on_message: Optional[Callable[[bytes], None]] = None
+        self._reconnect: Optional[asyncio.Task] = None
+        self._pending: "set[asyncio.Task]" = set()
+        # Соединение asyncpg не выполняет запросы параллельно
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def start(self, on_message: Callable[[bytes], None]) -> None:
+        self._on_message = on_message
+        await self._connect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.channel, self._listener)
+        connection.add_termination_listener(self._terminated)
+        self._connection = connection
+        logger.info("Шина инвалидации: LISTEN %s", self.channel)
+
+    def _listener(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._on_message(payload.encode())
+
+    def _terminated(self, connection) -> None:
+        if self._closed:
+            return
+        logger.warning("Шина инвалидации: соединение LISTEN потеряно, кэш очищен")
+        self._connection = None
+        self.cache.clear()
+        self._reconnect = asyncio.get_running_loop().create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self._connect()
+            except Exception as e:
+                logger.warning("Шина инвалидации: переподключение не удалось: %s", e)
+                continue
+            # Сообщения, пропущенные за время обрыва, не восстановить
+            self.cache.clear()
+            return
+
+    def send(self, payload: bytes) -> None:
+        if self._connection is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._notify(payload.decode()))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, payload: str) -> None:
+        try:
+            async with self._lock:
+                await self._connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+        except Exception as e:
+            logger.warning("Шина инвалидации: NOTIFY не отправлен: %s", e)
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class InvalidationBus:
+    """Публикация сброшенных ключей кэша и применение чужих сбросов"""
+
+    def __init__(self, transport: InvalidationTransport, caches: Iterable[EntityCache]):
+        self.transport = transport
+        self.caches: List[EntityCache] = list(caches)
+        # Свои сообщения (NOTIFY приходит и отправителю) пропускаются
+        self.origin = uuid.uuid4().hex
+
+    async def start(self) -> None:
+        await self.transport.start(self._receive)
+
+    def publish(self, keys: Sequence[Key]) -> None:
+        """
+        Разослать ключи, сброшенные в кэше этого воркера
+
+        Версия ключа позволяет получателю не сбрасывать уже загруженную
+        новую версию и не принять в кэш загрузку, начатую до сброса.
+        """
+        keys = list(keys)
+        for start in range(0, len(keys), KEYS_PER_MESSAGE):
+            payload = json.dumps({
+                "origin": self.origin,
+                "sent_at": time.time(),
+                "keys": [list(key) for key in keys[start:start + KEYS_PER_MESSAGE]],
+            })
+            self.transport.send(payload.encode())
+            INVALIDATION_MESSAGES.inc("sent")
+
+    def publish_clear(self) -> None:
+        """Разослать сброс кэша целиком (измененные ключи неизвестны)"""
+        payload = json.dumps({"origin": self.origin, "sent_at": time.time(), "clear": True})
+        self.transport.send(payload.encode())
+        INVALIDATION_MESSAGES.inc("sent")
+
+    def _receive(self, payload: bytes) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Шина инвалидации: некорректное сообщение")
+            return
+        if message.get("origin") == self.origin:
+            return
+        if message.get("clear"):
+            for cache in self.caches:
+                cache.clear()
+        for key in message.get("keys", ()):
+            # Ключ без версии - от воркера предыдущей версии при обновлении
+            table, entity_id, version = key if len(key) == 3 else (*key, None)
+            for cache in self.caches:
+                cache.invalidate((table, entity_id), version)
+        INVALIDATION_MESSAGES.inc("received")
+        INVALIDATION_LAG.observe(max(time.time() - message["sent_at"], 0.0))
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+
+invalidation_bus: Optional[InvalidationBus] = None
+
+
+def publish_invalidation(keys: Sequence[Key]) -> None:
+    """Разослать сброшенные ключи другим воркерам, если шина запущена"""
+    if invalidation_bus is not None and keys:
+        invalidation_bus.publish(keys)
+
+
+def publish_clear() -> None:
+    """Разослать другим воркерам сброс кэша целиком, если шина запущена"""
+    if invalidation_bus is not None:
+        invalidation_bus.publish_clear()
+
+
+def make_transport(kind: str) -> Optional[InvalidationTransport]:
+    """Транспорт по настройке cache_invalidation_transport (none, unix, postgres)"""
+    if kind == "unix":
+        return UnixSocketTransport(settings.cache_invalidation_socket_dir)
+    if kind == "postgres":
+        dsn = settings.database_url.replace("postgresql+asyncpg://", "postgresql://")
+        return PostgresNotifyTransport(dsn, settings.cache_invalidation_channel, entity_cache)
+    if kind != "none":
+        raise ValueError(f"Unknown cache invalidation transport: {kind}")
+    return None
+
+
+async def start_invalidation_bus() -> None:
+    """Запустить шину при старте воркера (только при включенном кэше)"""
+    global invalidation_bus
+    if not settings.entity_cache_enabled:
+        return
+    transport = make_transport(settings.cache_invalidation_transport)
+    if transport is None:
+        return
+    bus = InvalidationBus(transport, [entity_cache])
+    await bus.start()
+    invalidation_bus = bus
+    logger.info("Шина инвалидации кэша запущена: %s", settings.cache_invalidation_transport)
+
+
+async def stop_invalidation_bus() -> None:
+    """Остановить шину при завершении воркера"""
+    global invalidation_bus
+    if invalidation_bus is not None:
+        bus, invalidation_bus = invalidation_bus, None
+        await bus.close()
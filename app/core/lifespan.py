@@ -1,12 +1,19 @@
 from contextlib import asynccontextmanager
 
-from app.core.database import engine
+from app.core.database import engine, replica_engines
+from app.core.invalidation import start_invalidation_bus, stop_invalidation_bus
+from app.domains.answers.batcher import answer_write_batcher
 
 
 @asynccontextmanager
 async def lifespan(app):
     """Управление жизненным циклом приложения"""
     # Startup
+    await start_invalidation_bus()
     yield
-    # Shutdown
+    # Shutdown: дописать накопленные ответы до закрытия пула
+    await answer_write_batcher.close()
+    await stop_invalidation_bus()
     await engine.dispose()
+    for replica_engine in replica_engines:
+        await replica_engine.dispose()
@@ -1,7 +1,294 @@
-from fastapi import FastAPI
+import math
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.admission import (
+    ADMISSION_REJECTED,
+    AdmissionController,
+    ClientRateLimiter,
+    admission_controller,
+    client_rate_limiter
+)
+from app.core.compression import (
+    StreamCompressor,
+    compressed_body,
+    is_compressible,
+    negotiate_encoding
+)
+from app.core.database import LAST_WRITE_COOKIE
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_TOTAL
+from app.core.serialization import envelope
 from app.utils.config import settings
+from app.utils.logger import bind_request, unbind_request
+
+
+class MetricsMiddleware:
+    """ASGI middleware: задержка и коды ответов по шаблону маршрута"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._route_paths: Dict[Callable[..., Any], str] = {}
+
+    def _route_path(self, scope: Scope) -> str:
+        """Шаблон пути маршрута (например, /api/v1/questions/{question_id})"""
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            # Маршрут не найден - не плодим метки из произвольных путей
+            return "unmatched"
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            path = "unmatched"
+            for route in scope["app"].router.routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    path = route.path
+                    break
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = self._route_path(scope)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, scope["method"], route)
+            HTTP_REQUESTS_TOTAL.inc(scope["method"], route, str(status_code or 500))
+
+
+class RequestContextMiddleware:
+    """ASGI middleware: ID запроса и выборка INFO-логов на уровне запроса"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-request-id", request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        tokens = bind_request(request_id, random.random() < settings.log_sample_rate)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            unbind_request(tokens)
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware: отмечает в cookie время успешной записи клиента
+
+    По этой отметке get_read_db направляет чтения клиента на primary,
+    пока не истечет окно read-your-writes.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, app: ASGIApp, window: float):
+        self.app = app
+        self.max_age = math.ceil(window)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={time.time():.3f}; Max-Age={self.max_age}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode("latin-1"))
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: сжатие ответов по Accept-Encoding
+
+    Ответы короче minimum_size не сжимаются. Сжатые тела ответов с ETag
+    кэшируются по версии ресурса, чтобы не сжимать их на каждый запрос.
+    Потоковые ответы сжимаются по частям.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[StreamCompressor] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                chunk = compressor.compress(body)
+                if not more_body:
+                    chunk += compressor.finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            etag = headers.get("etag")
+            if start_message["status"] in (200, 304) and "content-encoding" not in headers:
+                # Ответ 304 не знает, было бы сжато тело ответа 200 или нет, поэтому
+                # при согласованном сжатии оба получают одинаковые Vary и слабый ETag
+                self._mark_variant(headers)
+            if (
+                start_message["status"] != 200
+                or "content-encoding" in headers
+                or not is_compressible(headers.get("content-type"))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+
+            if more_body:
+                del headers["Content-Length"]
+                compressor = StreamCompressor(encoding)
+                await send(start_message)
+                await send({
+                    "type": "http.response.body",
+                    "body": compressor.compress(body),
+                    "more_body": True
+                })
+                return
+
+            cache_key = None
+            if etag is not None:
+                cache_key = (scope["path"], scope["query_string"], etag)
+            compressed = compressed_body(body, encoding, cache_key)
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _mark_variant(headers: MutableHeaders) -> None:
+        """Отметить представление, зависящее от Accept-Encoding"""
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag is not None and not etag.startswith("W/"):
+            # Сжатое представление не побайтно равно исходному
+            headers["ETag"] = f"W/{etag}"
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware: контроль допуска и ограничение частоты запросов клиентов
+
+    Отказы отдаются сразу в формате StandardResponse: 429 при превышении
+    частоты клиентом, 503 при переполнении очереди ожидания слота.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        rate_limiter: Optional[ClientRateLimiter] = None,
+        exempt_paths: Sequence[str] = ()
+    ):
+        self.app = app
+        self.controller = controller
+        self.rate_limiter = rate_limiter
+        self.exempt_paths = frozenset(exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if self.rate_limiter is not None:
+            client = scope.get("client")
+            retry_after = self.rate_limiter.check(client[0] if client else "unknown")
+            if retry_after > 0:
+                ADMISSION_REJECTED.inc("rate_limited")
+                response = envelope(
+                    "Too many requests",
+                    None,
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+                await response(scope, receive, send)
+                return
+
+        rejected = await self.controller.acquire()
+        if rejected is not None:
+            ADMISSION_REJECTED.inc(rejected)
+            response = envelope(
+                "Service is overloaded, try again later",
+                None,
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
 
 
 def setup_middleware(app: FastAPI) -> None:
@@ -14,3 +301,27 @@ def setup_middleware(app: FastAPI) -> None:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # Сжатие ответов
+    if settings.compression_enabled:
+        app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+    # Контекст запроса для логов
+    app.add_middleware(RequestContextMiddleware)
+
+    # Отметка записей клиента для чтения своих записей с primary (нужна только с репликами)
+    if settings.database_replica_urls and settings.read_your_writes_window > 0:
+        app.add_middleware(ReadYourWritesMiddleware, window=settings.read_your_writes_window)
+
+    # Контроль допуска перед пулом соединений (отказы тоже попадают в метрики)
+    if admission_controller is not None:
+        app.add_middleware(
+            AdmissionMiddleware,
+            controller=admission_controller,
+            rate_limiter=client_rate_limiter,
+            exempt_paths=settings.admission_exempt_paths
+        )
+
+    # Метрики запросов
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
@@ -0,0 +1,65 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или не соответствует запросу"""
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Закодировать позицию keyset-пагинации в непрозрачный курсор
+
+    Args:
+        values: Значения ключа сортировки последней строки страницы
+
+    Returns:
+        Строка курсора (base64url без паддинга)
+    """
+    payload = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """
+    Раскодировать курсор и проверить типы его значений
+
+    Args:
+        cursor: Строка курсора, полученная от encode_cursor
+        types: Ожидаемые типы значений ключа сортировки
+
+    Returns:
+        Кортеж значений ключа сортировки
+
+    Raises:
+        InvalidCursorError: Если курсор не удалось разобрать
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise InvalidCursorError("Invalid pagination cursor")
+
+    values = []
+    for value, expected in zip(payload, types):
+        try:
+            if expected is datetime:
+                value = datetime.fromisoformat(value)
+            elif expected is float and isinstance(value, int) and not isinstance(value, bool):
+                value = float(value)
+            elif not isinstance(value, expected) or isinstance(value, bool):
+                raise TypeError
+        except (TypeError, ValueError):
+            raise InvalidCursorError("Invalid pagination cursor")
+        values.append(value)
+    return tuple(values)
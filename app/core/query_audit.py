@@ -0,0 +1,244 @@
+"""
+Аудит планов запросов репозиториев
+
+Прогоняет типовую нагрузку по всем методам репозиториев в транзакции,
+которая затем откатывается, собирает выполненные SQL-запросы и строит
+для каждого EXPLAIN. Последовательные сканирования таблиц, в которых
+больше строк, чем порог, попадают в отчет.
+"""
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from app.core.database import Base
+from app.domains.answers.repository import AnswerRepository
+from app.domains.answers.schemas import AnswerCreateSchema
+from app.domains.questions.repository import QuestionRepository
+from app.domains.questions.schemas import QuestionCreateSchema, QuestionSort
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Операции, для которых полный проход по таблице заложен в саму операцию:
+# экспорт и пересчет счетчиков
+FULL_SCAN_OPERATIONS = {
+    "QuestionRepository.stream_chunks",
+    "QuestionRepository.recompute_answer_counts",
+}
+
+# Запросы, для которых строится план
+EXPLAINED_VERBS = ("select", "update", "delete", "with")
+
+_operation_var: ContextVar[Optional[str]] = ContextVar("audit_operation", default=None)
+
+
+@dataclass
+class CapturedQuery:
+    """SQL-запрос, выполненный операцией репозитория"""
+
+    operation: str
+    statement: str
+    parameters: Any
+
+
+@dataclass
+class ScanFinding:
+    """Последовательное сканирование таблицы в плане запроса"""
+
+    operation: str
+    table: str
+    rows: int
+    detail: str
+    statement: str
+
+    @property
+    def expected(self) -> bool:
+        """Полный проход заложен в саму операцию"""
+        return self.operation in FULL_SCAN_OPERATIONS
+
+
+@contextmanager
+def _operation(name: str) -> Iterator[None]:
+    token = _operation_var.set(name)
+    try:
+        yield
+    finally:
+        _operation_var.reset(token)
+
+
+async def _run_workload(session: AsyncSession) -> None:
+    """Вызвать каждый метод репозиториев, выполняющий запросы"""
+    questions = QuestionRepository(session)
+    answers = AnswerRepository(session)
+
+    with _operation("QuestionRepository.create"):
+        question = await questions.create(QuestionCreateSchema(text="Аудит планов запросов"))
+    with _operation("QuestionRepository.create_many"):
+        extra = await questions.create_many([QuestionCreateSchema(text="Аудит: второй вопрос")])
+    with _operation("AnswerRepository.create"):
+        answer = await answers.create(question.id, AnswerCreateSchema(text="Ответ", user_id=1))
+    with _operation("AnswerRepository.create_many"):
+        await answers.create_many(question.id, [AnswerCreateSchema(text="Еще ответ", user_id=2)])
+    with _operation("AnswerRepository.create_batch"):
+        await answers.create_batch([
+            (question.id, AnswerCreateSchema(text="Пачка", user_id=3)),
+            (extra[0].id, AnswerCreateSchema(text="Пачка", user_id=3)),
+        ])
+
+    with _operation("QuestionRepository.get_all"):
+        page = await questions.get_all(21)
+        await questions.get_all(21, (page[-1].created_at, page[-1].id))
+        await questions.get_all(21, sort=QuestionSort.answer_count)
+        await questions.get_all(21, (0, page[-1].id), sort=QuestionSort.answer_count)
+    with _operation("QuestionRepository.search"):
+        await questions.search("аудит", 21)
+        await questions.search("аудит", 21, (1.0, question.id))
+    with _operation("QuestionRepository.get_page_versions"):
+        await questions.get_page_versions(21)
+        await questions.get_page_versions(21, sort=QuestionSort.answer_count)
+    with _operation("QuestionRepository.get_version_with_answers"):
+        await questions.get_version_with_answers(question.id)
+    with _operation("QuestionRepository.get_by_id_with_answers"):
+        await questions.get_by_id_with_answers(question.id, 21)
+        await questions.get_by_id_with_answers(question.id, 21, (answer.created_at, answer.id))
+    with _operation("QuestionRepository.get_answers_for_questions"):
+        await questions.get_answers_for_questions([question.id, extra[0].id])
+    with _operation("QuestionRepository.stream_chunks"):
+        async for _ in questions.stream_chunks(1000):
+            break
+
+    with _operation("AnswerRepository.get_by_id"):
+        await answers.get_by_id(answer.id)
+    with _operation("AnswerRepository.get_version"):
+        await answers.get_version(answer.id)
+    with _operation("AnswerRepository.question_exists"):
+        await answers.question_exists(question.id)
+    with _operation("AnswerRepository.get_by_user"):
+        await answers.get_by_user(1, 21)
+        await answers.get_by_user(1, 21, (answer.created_at, answer.id))
+    with _operation("AnswerRepository.delete"):
+        await answers.delete(answer.id)
+    with _operation("QuestionRepository.recompute_answer_counts"):
+        await questions.recompute_answer_counts()
+    with _operation("QuestionRepository.delete"):
+        await questions.delete(question.id)
+    with _operation("QuestionRepository.mark_deleted"):
+        await questions.mark_deleted(extra[0].id)
+    with _operation("QuestionRepository.get_marked_deleted_ids"):
+        await questions.get_marked_deleted_ids()
+    with _operation("QuestionRepository.purge_deleted"):
+        await questions.purge_deleted(extra[0].id, 1000)
+
+
+async def _explain_sqlite(conn: AsyncConnection, query: CapturedQuery) -> List[Tuple[str, str]]:
+    """(таблица, строка плана) для полных сканирований таблиц в SQLite"""
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {query.statement}", query.parameters)
+    scans = []
+    for row in result:
+        detail = row[-1]
+        # "SCAN answers" - проход по таблице; "SCAN ... USING INDEX" - по индексу
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            scans.append((detail.split()[1], detail))
+    return scans
+
+
+def _postgres_seq_scans(plan: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"], f"Seq Scan on {plan['Relation Name']}"
+    for child in plan.get("Plans", []):
+        yield from _postgres_seq_scans(child)
+
+
+async def _explain_postgres(conn: AsyncConnection, query: CapturedQuery) -> List[Tuple[str, str]]:
+    """(таблица, узел плана) для Seq Scan в PostgreSQL"""
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {query.statement}", query.parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(_postgres_seq_scans(plan[0]["Plan"]))
+
+
+async def _table_rows(conn: AsyncConnection, table: str) -> int:
+    """Число строк таблицы (оценка статистики в PostgreSQL)"""
+    if conn.dialect.name == "postgresql":
+        rows = await conn.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {"table": table}
+        )
+        return max(int(rows or 0), 0)
+    return int(await conn.scalar(text(f'SELECT count(*) FROM "{table}"')))
+
+
+async def audit_queries(engine: AsyncEngine, row_threshold: int = 1000) -> List[ScanFinding]:
+    """
+    Найти последовательные сканирования в запросах репозиториев
+
+    Нагрузка выполняется в транзакции, которая откатывается: данные БД
+    не меняются. commit() репозиториев фиксирует только точку сохранения.
+
+    Args:
+        engine: Асинхронный движок проверяемой БД
+        row_threshold: Сканирования таблиц с числом строк не больше порога не считаются
+
+    Returns:
+        Найденные сканирования
+    """
+    captured: List[CapturedQuery] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        operation = _operation_var.get()
+        if operation is None or not statement.lstrip().lower().startswith(EXPLAINED_VERBS):
+            return
+        if executemany:
+            parameters = parameters[0]
+        captured.append(CapturedQuery(operation, statement, parameters))
+
+    explain = _explain_postgres if engine.dialect.name == "postgresql" else _explain_sqlite
+    tables = set(Base.metadata.tables)
+    findings: List[ScanFinding] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with engine.connect() as conn:
+            transaction = await conn.begin()
+            if conn.dialect.name == "sqlite":
+                # pysqlite не открывает транзакцию сам до первого DML:
+                # без явного BEGIN RELEASE SAVEPOINT зафиксировал бы изменения
+                await conn.exec_driver_sql("BEGIN")
+            try:
+                session = AsyncSession(
+                    bind=conn,
+                    expire_on_commit=False,
+                    join_transaction_mode="create_savepoint"
+                )
+                await _run_workload(session)
+                await session.close()
+                event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+                seen = set()
+                row_counts: Dict[str, int] = {}
+                for query in captured:
+                    if query.statement in seen:
+                        continue
+                    seen.add(query.statement)
+                    for table, detail in await explain(conn, query):
+                        if table not in tables:
+                            continue
+                        if table not in row_counts:
+                            row_counts[table] = await _table_rows(conn, table)
+                        if row_counts[table] > row_threshold:
+                            findings.append(ScanFinding(
+                                query.operation, table, row_counts[table], detail, query.statement
+                            ))
+            finally:
+                await transaction.rollback()
+    finally:
+        if event.contains(engine.sync_engine, "before_cursor_execute", capture):
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    logger.info("Проверено запросов: %s, найдено сканирований: %s", len(seen), len(findings))
+    return findings
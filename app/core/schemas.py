@@ -1,5 +1,5 @@
-from typing import Generic, TypeVar, Optional
-from pydantic import BaseModel
+from typing import Any, Generic, TypeVar, Optional, List
+from pydantic import BaseModel, ValidationError
 
 T = TypeVar('T')
 
@@ -11,3 +11,31 @@ class StandardResponse(BaseModel, Generic[T]):
 
     class Config:
         from_attributes = True
+
+
+class PaginatedResponse(StandardResponse[List[T]], Generic[T]):
+    """Стандартный ответ со страницей данных и курсором следующей страницы"""
+    next_cursor: Optional[str] = None
+
+
+class BatchItemErrorSchema(BaseModel):
+    """Ошибка валидации одного элемента пакета"""
+    index: int
+    message: str
+    errors: List[Any] = []
+
+
+class BatchResultSchema(BaseModel, Generic[T]):
+    """Результат пакетной операции: созданные элементы и ошибки по индексам"""
+    created: List[T] = []
+    errors: List[BatchItemErrorSchema] = []
+
+
+def batch_item_error(index: int, exc: ValidationError) -> BatchItemErrorSchema:
+    """Преобразовать ошибку валидации элемента пакета в BatchItemErrorSchema"""
+    errors = exc.errors(include_url=False, include_context=False)
+    message = "; ".join(
+        f"{' -> '.join(str(loc) for loc in error['loc']) or 'item'}: {error['msg']}"
+        for error in errors
+    )
+    return BatchItemErrorSchema(index=index, message=message, errors=errors)
@@ -0,0 +1,79 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar
+
+import orjson
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+SchemaType = TypeVar("SchemaType", bound=BaseModel)
+
+
+def _orjson_default(value: Any) -> Any:
+    """Преобразование типов, которые orjson не сериализует сам"""
+    if isinstance(value, BaseModel):
+        # python-режим: datetime и вложенные типы сериализует orjson
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(ORJSONResponse):
+    """ORJSONResponse, который сериализует Pydantic-модели без промежуточного JSON-режима"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            # OPT_UTC_Z: время UTC с "Z", как в JSON-режиме Pydantic
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[SchemaType]) -> TypeAdapter:
+    """Закэшированный TypeAdapter для списка схем"""
+    return TypeAdapter(List[schema])
+
+
+def validate_many(schema: Type[SchemaType], objects: Sequence[Any]) -> List[SchemaType]:
+    """
+    Преобразовать ORM-объекты в список схем одним проходом валидации
+
+    Args:
+        schema: Класс Pydantic-схемы
+        objects: ORM-объекты
+
+    Returns:
+        Список схем
+    """
+    return list_adapter(schema).validate_python(objects, from_attributes=True)
+
+
+def envelope(
+    message: str,
+    data: Any = None,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None,
+    **extra: Any
+) -> FastJSONResponse:
+    """
+    Сформировать ответ в формате StandardResponse за одну сериализацию
+
+    Данные уже провалидированы сервисом, поэтому ответ возвращается
+    как готовый Response и не проходит повторную валидацию response_model.
+
+    Args:
+        message: Сообщение ответа
+        data: Данные (схемы, списки схем, словари)
+        status_code: HTTP-код ответа
+        headers: Дополнительные заголовки
+        extra: Дополнительные поля конверта (например, next_cursor)
+
+    Returns:
+        FastJSONResponse с конвертом {"message", "data", ...}
+    """
+    return FastJSONResponse(
+        {"message": message, "data": data, **extra},
+        status_code=status_code,
+        headers=headers
+    )
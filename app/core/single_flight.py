@@ -0,0 +1,112 @@
+"""
+Объединение одинаковых конкурентных чтений (single flight)
+
+Пока выполняется загрузка по ключу, остальные запросы с тем же ключом
+не идут в БД, а ждут ее результат. Дополнительно результат может
+раздаваться еще share_window секунд после завершения загрузки.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.core.cache import EntityCache
+from app.core.metrics import registry
+from app.utils.config import settings
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_REQUESTS = registry.counter(
+    "single_flight_requests_total",
+    "Coalesced reads by outcome: load, joined (in-flight) or shared (window)",
+    ("outcome",)
+)
+
+
+class _LeaderCancelled(Exception):
+    """Загрузка отменена вместе с запросом, который ее начал"""
+
+
+class SingleFlight:
+    """Одна загрузка из БД на ключ для всех одновременных запросов"""
+
+    def __init__(self, share_window: float = 0.0, maxsize: int = 1024):
+        """
+        Args:
+            share_window: Сколько секунд раздавать готовый результат (0 - только in-flight)
+            maxsize: Максимальное количество результатов в окне раздачи
+        """
+        self.share_window = share_window
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._shared: Optional[EntityCache] = (
+            EntityCache(maxsize=maxsize, ttl=share_window) if share_window > 0 else None
+        )
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Выполнить загрузку или присоединиться к уже идущей с тем же ключом
+
+        Args:
+            key: Ключ загрузки (одинаковые ключи - одинаковый результат)
+            load: Загрузка; выполняется только в первом из одновременных запросов
+
+        Returns:
+            Результат загрузки
+
+        Raises:
+            Исключение загрузки - всем присоединившимся к ней запросам
+        """
+        while True:
+            if self._shared is not None:
+                value = self._shared.get(key)
+                if value is not None:
+                    SINGLE_FLIGHT_REQUESTS.inc("shared")
+                    return value
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            SINGLE_FLIGHT_REQUESTS.inc("joined")
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                # Запрос, начавший загрузку, отменен - загружаем заново
+                continue
+
+        SINGLE_FLIGHT_REQUESTS.inc("load")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await load()
+        except asyncio.CancelledError:
+            self._fail(future, _LeaderCancelled())
+            raise
+        except Exception as e:
+            self._fail(future, e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        if self._shared is not None and value is not None:
+            self._shared.set(key, value)
+        return value
+
+    @staticmethod
+    def _fail(future: asyncio.Future, error: BaseException) -> None:
+        future.set_exception(error)
+        # Исключение могут не забрать, если никто не присоединился
+        future.exception()
+
+    def clear(self) -> None:
+        """Забыть раздаваемые результаты"""
+        if self._shared is not None:
+            self._shared.clear()
+
+
+question_reads = SingleFlight(
+    share_window=settings.single_flight_share_window,
+    maxsize=settings.single_flight_share_maxsize
+)
+
+
+def get_question_reads() -> Optional[SingleFlight]:
+    """Dependency: объединение чтений вопросов (None, если отключено)"""
+    return question_reads if settings.single_flight_enabled else None
@@ -0,0 +1,112 @@
+"""
+Групповая фиксация записей (group commit) внутри процесса
+
+Конкурентные запросы на запись не открывают каждый свою транзакцию:
+элементы, пришедшие в пределах окна, записываются одной пачкой и одним
+commit, а каждый ожидающий запрос получает свой результат или ошибку.
+"""
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar, Union
+
+from app.core.metrics import registry
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+# Функция записи пачки: результат или исключение для каждого элемента, по порядку
+FlushFunction = Callable[[List[ItemT]], Awaitable[List[Union[ResultT, BaseException]]]]
+
+WRITE_BATCH_SIZE = registry.histogram(
+    "write_batch_size",
+    "Items written per group commit",
+    ("batcher",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)
+)
+
+
+class WriteBatcher(Generic[ItemT, ResultT]):
+    """
+    Накопитель записей с фиксацией по размеру пачки или по истечении окна
+
+    Пачка записывается, когда набралось max_items элементов или через
+    max_delay секунд после первого элемента пачки - что наступит раньше.
+    """
+
+    def __init__(self, name: str, flush: FlushFunction, max_items: int, max_delay: float):
+        """
+        Args:
+            name: Имя для метрик и логов
+            flush: Запись пачки элементов
+            max_items: Максимальный размер пачки
+            max_delay: Максимальное ожидание первого элемента пачки, с
+        """
+        self.name = name
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self._flush_function = flush
+        self._pending: List[Tuple[ItemT, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: "set[asyncio.Task]" = set()
+
+    async def submit(self, item: ItemT) -> ResultT:
+        """
+        Добавить элемент в текущую пачку и дождаться ее записи
+
+        Returns:
+            Результат записи элемента
+
+        Raises:
+            Исключение, которое flush вернул для этого элемента
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_items:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._start_flush)
+        # shield: отмена одного запроса не должна отменять запись всей пачки
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Результат элемента больше никто не ждет: _flush пропустит отмененный
+            # future, и его ошибка не попадет в лог как необработанная
+            future.cancel()
+            raise
+
+    def _start_flush(self) -> None:
+        """Забрать накопленную пачку и записать ее в отдельной задаче"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[ItemT, asyncio.Future]]) -> None:
+        WRITE_BATCH_SIZE.observe(len(batch), self.name)
+        try:
+            results = await self._flush_function([item for item, _ in batch])
+        except Exception as e:
+            logger.error("Ошибка записи пачки %s из %s элементов: %s", self.name, len(batch), e)
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            # Ожидающий запрос отменен (или future уже завершен)
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self) -> None:
+        """Записать накопленные элементы и дождаться всех начатых записей"""
+        self._start_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
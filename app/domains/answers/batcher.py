@@ -0,0 +1,38 @@
+from typing import List, Tuple, Union
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import get_entity_cache
+from app.core.database import AsyncSessionLocal
+from app.core.write_batcher import WriteBatcher
+from app.domains.answers.model import Answer
+from app.domains.answers.repository import AnswerRepository
+from app.domains.answers.schemas import AnswerCreateSchema
+from app.utils.config import settings
+
+# Элемент пачки: (ID вопроса, данные ответа)
+AnswerItem = Tuple[int, AnswerCreateSchema]
+
+
+def make_answer_write_batcher(
+    session_factory: async_sessionmaker = AsyncSessionLocal
+) -> WriteBatcher[AnswerItem, Answer]:
+    """
+    Накопитель создания ответов: одна пачка - один INSERT и один commit
+
+    Пачка пишется в собственной сессии, так как объединяет запросы
+    с разными сессиями.
+    """
+    async def flush(items: List[AnswerItem]) -> List[Union[Answer, Exception]]:
+        async with session_factory() as session:
+            return await AnswerRepository(session, get_entity_cache()).create_batch(items)
+
+    return WriteBatcher(
+        "answers",
+        flush,
+        max_items=settings.answer_write_batch_max_items,
+        max_delay=settings.answer_write_batch_max_delay
+    )
+
+
+answer_write_batcher = make_answer_write_batcher()
@@ -7,7 +7,8 @@ from app.core.base_model import BaseModel
 class Answer(BaseModel):
     __tablename__ = "answers"
     __table_args__ = (
-        Index('ix_answers_id', 'id'),
+        Index('ix_answers_question_id_created_at_id', 'question_id', 'created_at', 'id'),
+        Index('ix_answers_user_id_created_at_id', 'user_id', 'created_at', 'id'),
     )
 
     question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
@@ -1,7 +1,18 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 
-from app.core.base_repository import BaseRepository
+from app.core.base_repository import (
+    BaseRepository,
+    StaleKey,
+    StatementType,
+    entity_version,
+    is_foreign_key_violation
+)
+from app.core.cache import EntityCache
 from app.domains.answers.model import Answer
 from app.domains.questions.model import Question
 from app.domains.answers.schemas import AnswerCreateSchema
@@ -13,38 +24,200 @@ logger = get_logger(__name__)
 class AnswerRepository(BaseRepository[Answer]):
     """Репозиторий для работы с ответами"""
 
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, Answer)
+    def __init__(self, db: AsyncSession, cache: Optional[EntityCache] = None):
+        super().__init__(db, Answer, cache)
+
+    def _visible(self, query: StatementType) -> StatementType:
+        """Ответы вопросов, отмеченных на удаление, не видны до окончания очистки"""
+        return query.where(
+            exists().where(Question.id == Answer.question_id, Question.deleted_at.is_(None))
+        )
 
     async def create(self, question_id: int, answer_data: AnswerCreateSchema) -> Answer:
         """Создать новый ответ к вопросу"""
-        logger.info(f"Создание ответа для вопроса с ID: {question_id}")
+        logger.info("Создание ответа для вопроса с ID: %s", question_id)
+        answers = await self._insert_for_question(
+            question_id,
+            [self._answer_values(question_id, answer_data)]
+        )
+        logger.info("Ответ создан с ID: %s", answers[0].id)
+        return answers[0]
 
-        try:
-            # Проверка существования вопроса
-            result = await self.db.execute(
-                select(Question).filter(Question.id == question_id)
-            )
-            question = result.scalar_one_or_none()
-            if not question:
-                logger.error(f"Question with ID {question_id} not found")
-                raise ValueError(f"Question with ID {question_id} does not exist")
+    async def create_many(
+        self,
+        question_id: int,
+        answers_data: Sequence[AnswerCreateSchema]
+    ) -> List[Answer]:
+        """
+        Создать пачку ответов к вопросу одним многострочным INSERT ... RETURNING
+
+        Args:
+            question_id: ID вопроса
+            answers_data: Данные ответов
+
+        Returns:
+            Созданные ответы в порядке входных данных
+        """
+        logger.info("Пакетное создание %s ответов для вопроса с ID: %s", len(answers_data), question_id)
+        answers = await self._insert_for_question(
+            question_id,
+            [self._answer_values(question_id, data) for data in answers_data]
+        )
+        logger.info("Создано ответов: %s", len(answers))
+        return answers
+
+    async def create_batch(
+        self,
+        items: Sequence[Tuple[int, AnswerCreateSchema]]
+    ) -> List[Union[Answer, Exception]]:
+        """
+        Создать ответы к разным вопросам одним INSERT и одним commit
+
+        Ответы к несуществующим или удаленным вопросам отсеиваются заранее
+        одним запросом. Если пачка все же не записалась (например, вопрос
+        удален между проверкой и вставкой), ответы создаются по одному,
+        чтобы ошибка досталась только своему элементу.
+
+        Args:
+            items: Пары (ID вопроса, данные ответа)
 
-            answer = Answer(
-                question_id=question_id,
-                text=answer_data.text,
-                user_id=answer_data.user_id
-            )
-            self.db.add(answer)
-            await self.db.commit()
-            await self.db.refresh(answer)
-            logger.info(f"Ответ создан с ID: {answer.id}")
-            return answer
+        Returns:
+            Созданный ответ или исключение для каждого элемента, по порядку
+            (ValueError - вопрос не найден)
+        """
+        question_ids = {question_id for question_id, _ in items}
+        result = await self.db.execute(
+            select(Question.id)
+            .filter(Question.id.in_(question_ids), Question.deleted_at.is_(None))
+        )
+        existing = set(result.scalars().all())
+        results: List[Union[Answer, Exception]] = [
+            ValueError(f"Question with ID {question_id} does not exist")
+            for question_id, _ in items
+        ]
+        valid = [index for index, (question_id, _) in enumerate(items) if question_id in existing]
+
+        logger.info("Групповая запись %s ответов", len(valid))
+        try:
+            answers = await self.insert_many([self._answer_values(*items[index]) for index in valid])
         except Exception as e:
-            await self.db.rollback()
-            logger.error(f"Error creating answer: {str(e)}")
-            raise
+            logger.warning("Пачка ответов не записана (%s), запись по одному", e)
+            for index in valid:
+                try:
+                    results[index] = await self.create(*items[index])
+                except Exception as item_error:
+                    # create уже откатил транзакцию - сессия пригодна для следующих
+                    results[index] = item_error
+            return results
+
+        for index, answer in zip(valid, answers):
+            results[index] = answer
+        return results
+
+    async def question_exists(self, question_id: int) -> bool:
+        """Проверить, что вопрос существует и не отмечен на удаление"""
+        result = await self.db.execute(
+            select(Question.id)
+            .filter(Question.id == question_id, Question.deleted_at.is_(None))
+        )
+        return result.scalar_one_or_none() is not None
+
+    async def get_by_user(
+        self,
+        user_id: int,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Answer]:
+        """
+        Получить страницу ответов пользователя (keyset по user_id, created_at, id)
+
+        Args:
+            user_id: ID пользователя
+            limit: Максимальное количество ответов
+            after: Ключ (created_at, id) последнего ответа предыдущей страницы
+
+        Returns:
+            Ответы пользователя от новых к старым
+        """
+        logger.info("Получение ответов пользователя %s (limit=%s)", user_id, limit)
+        query = self._visible(select(Answer).filter(Answer.user_id == user_id))
+        if after is not None:
+            query = query.filter(tuple_(Answer.created_at, Answer.id) < tuple_(*after))
+        result = await self.db.execute(
+            query
+            .order_by(Answer.created_at.desc(), Answer.id.desc())
+            .limit(limit)
+        )
+        return list(result.scalars().all())
 
     async def delete(self, answer_id: int) -> bool:
         """Удалить ответ"""
         return await super().delete(answer_id)
+
+    async def _after_insert(self, entities: List[Answer]) -> List[StaleKey]:
+        """Увеличить answer_count вопросов в той же транзакции"""
+        added = Counter(answer.question_id for answer in entities)
+        stale_keys: List[StaleKey] = []
+        # Один порядок блокировок строк вопросов во всех транзакциях - без взаимоблокировок
+        for question_id, count in sorted(added.items()):
+            updated_at = await self._shift_answer_count(question_id, count)
+            if updated_at is None:
+                # Вопрос отмечен на удаление - вставка откатывается
+                raise ValueError(f"Question with ID {question_id} does not exist")
+            stale_keys.append((Question.__tablename__, question_id, entity_version(updated_at)))
+        return stale_keys
+
+    async def _after_delete(self, entity: Answer) -> List[StaleKey]:
+        """Уменьшить answer_count вопроса в той же транзакции"""
+        updated_at = await self._shift_answer_count(entity.question_id, -1)
+        version = entity_version(updated_at) if updated_at is not None else None
+        return [(Question.__tablename__, entity.question_id, version)]
+
+    async def _shift_answer_count(self, question_id: int, delta: int) -> Optional[datetime]:
+        """
+        Атомарно изменить answer_count вопроса
+
+        Returns:
+            Новый updated_at вопроса или None, если вопрос не найден или отмечен на удаление
+        """
+        result = await self.db.execute(
+            update(Question)
+            .where(Question.id == question_id, Question.deleted_at.is_(None))
+            .values(answer_count=Question.answer_count + delta)
+            .returning(Question.updated_at)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _answer_values(question_id: int, answer_data: AnswerCreateSchema) -> Dict[str, Any]:
+        """Значения колонок нового ответа"""
+        return {
+            "question_id": question_id,
+            "text": answer_data.text,
+            "user_id": answer_data.user_id
+        }
+
+    async def _insert_for_question(
+        self,
+        question_id: int,
+        rows: List[Dict[str, Any]]
+    ) -> List[Answer]:
+        """
+        Вставить ответы без предварительной проверки вопроса
+
+        Отсутствие вопроса определяется по нарушению внешнего ключа.
+
+        Raises:
+            ValueError: Если вопрос не существует
+        """
+        try:
+            return await self.insert_many(rows)
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                logger.error("Question with ID %s not found", question_id)
+                raise ValueError(f"Question with ID {question_id} does not exist") from e
+            logger.error("Error creating answer: %s", e)
+            raise
+        except Exception as e:
+            logger.error("Error creating answer: %s", e)
+            raise
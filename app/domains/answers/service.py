@@ -1,15 +1,31 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError, OperationalError
 
+from app.core.etag import make_etag
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.schemas import BatchItemErrorSchema, BatchResultSchema, batch_item_error
+from app.core.serialization import validate_many
+from app.core.write_batcher import WriteBatcher
+from app.domains.answers.model import Answer
 from app.domains.answers.repository import AnswerRepository
 from app.domains.answers.schemas import AnswerCreateSchema, AnswerResponseSchema
+from app.utils.config import settings
 
 
 class AnswerService:
     """Сервис для работы с ответами (бизнес-логика)"""
 
-    def __init__(self, repository: AnswerRepository):
+    def __init__(
+        self,
+        repository: AnswerRepository,
+        write_batcher: Optional[WriteBatcher[Tuple[int, AnswerCreateSchema], Answer]] = None
+    ):
         self.repository = repository
+        # Групповая фиксация create_answer (None - каждый ответ своим commit)
+        self.write_batcher = write_batcher
 
     async def create_answer(
         self,
@@ -18,7 +34,10 @@ class AnswerService:
     ) -> AnswerResponseSchema:
         """Создать ответ к вопросу с обработкой ошибок"""
         try:
-            answer = await self.repository.create(question_id, answer_data)
+            if self.write_batcher is not None:
+                answer = await self.write_batcher.submit((question_id, answer_data))
+            else:
+                answer = await self.repository.create(question_id, answer_data)
             return AnswerResponseSchema.model_validate(answer)
         except ValueError as e:
             raise HTTPException(
@@ -36,6 +55,67 @@ class AnswerService:
                 detail="Database connection error"
             )
 
+    async def create_answers_batch(
+        self,
+        question_id: int,
+        items: List[Any]
+    ) -> BatchResultSchema[AnswerResponseSchema]:
+        """
+        Создать пачку ответов к вопросу в одной транзакции
+
+        Невалидные элементы не прерывают пакет, а возвращаются в errors
+        с индексом во входном списке.
+        """
+        if len(items) > settings.max_batch_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch size exceeds the limit of {settings.max_batch_size} items"
+            )
+
+        valid: List[AnswerCreateSchema] = []
+        errors: List[BatchItemErrorSchema] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append(AnswerCreateSchema.model_validate(item))
+            except ValidationError as e:
+                errors.append(batch_item_error(index, e))
+
+        # Пустая вставка не проверяет внешний ключ - вопрос проверяется явно
+        if not valid and not await self.repository.question_exists(question_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question with ID {question_id} does not exist"
+            )
+
+        try:
+            answers = await self.repository.create_many(question_id, valid)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=str(e)
+            )
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Data integrity error when creating answers"
+            )
+        except OperationalError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database connection error"
+            )
+        return BatchResultSchema[AnswerResponseSchema](
+            created=validate_many(AnswerResponseSchema, answers),
+            errors=errors
+        )
+
+    async def get_answer_etag(self, answer_id: int) -> Optional[str]:
+        """ETag ответа по updated_at (None, если ответ не найден)"""
+        version = await self.repository.get_version(answer_id)
+        if version is None:
+            return None
+        return make_etag("answer", answer_id, version)
+
     async def get_answer_by_id(self, answer_id: int) -> AnswerResponseSchema:
         """Получить ответ по ID с проверкой существования"""
         answer = await self.repository.get_by_id(answer_id)
@@ -46,6 +126,32 @@ class AnswerService:
             )
         return AnswerResponseSchema.model_validate(answer)
 
+    async def get_user_answers(
+        self,
+        user_id: int,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[AnswerResponseSchema], Optional[str]]:
+        """Получить страницу ответов пользователя и курсор следующей страницы"""
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor, datetime, int)
+            except InvalidCursorError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+        # Запрашиваем на одну строку больше, чтобы узнать о следующей странице
+        answers = await self.repository.get_by_user(user_id, limit + 1, after)
+        next_cursor = None
+        if len(answers) > limit:
+            answers = answers[:limit]
+            last = answers[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return validate_many(AnswerResponseSchema, answers), next_cursor
+
     async def delete_answer(self, answer_id: int) -> None:
         """Удалить ответ с проверкой существования"""
         deleted = await self.repository.delete(answer_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Text, Index
+from sqlalchemy import Column, DateTime, Integer, Text, Index, text
 from sqlalchemy.orm import relationship
 
 from app.core.base_model import BaseModel
@@ -7,13 +7,27 @@ from app.core.base_model import BaseModel
 class Question(BaseModel):
     __tablename__ = "questions"
     __table_args__ = (
-        Index('ix_questions_id', 'id'),
+        Index('ix_questions_created_at_id', 'created_at', 'id'),
+        Index('ix_questions_answer_count_id', 'answer_count', 'id'),
+        # Частичный индекс: отмеченных на удаление вопросов единицы
+        Index(
+            'ix_questions_deleted_at',
+            'deleted_at',
+            postgresql_where=text('deleted_at IS NOT NULL'),
+            sqlite_where=text('deleted_at IS NOT NULL')
+        ),
     )
 
     text = Column(Text, nullable=False)
+    # Денормализованное число ответов, поддерживается AnswerRepository
+    answer_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Отметка удаления: ответы вопроса удаляются фоновой задачей порциями
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     answers = relationship(
         "Answer",
         back_populates="question",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        # Ответы удаляет ON DELETE CASCADE в БД, без загрузки в сессию
+        passive_deletes=True
     )
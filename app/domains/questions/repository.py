@@ -1,11 +1,14 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Row, Select, delete, func, select, tuple_, update
 
-from app.core.base_repository import BaseRepository
+from app.core.base_repository import BaseRepository, StaleKey, StatementType
+from app.core.cache import EntityCache
+from app.domains.answers.model import Answer
 from app.domains.questions.model import Question
-from app.domains.questions.schemas import QuestionCreateSchema
+from app.domains.questions.schemas import QuestionCreateSchema, QuestionSort
+from app.domains.questions.search import ranked_question_ids
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,66 +17,402 @@ logger = get_logger(__name__)
 class QuestionRepository(BaseRepository[Question]):
     """Репозиторий для работы с вопросами"""
 
-    def __init__(self, db: AsyncSession):
-        super().__init__(db, Question)
+    def __init__(self, db: AsyncSession, cache: Optional[EntityCache] = None):
+        super().__init__(db, Question, cache)
 
-    async def get_all(self) -> List[Question]:
-        """Получить все вопросы"""
-        logger.info("Получение списка всех вопросов")
+    def _visible(self, query: StatementType) -> StatementType:
+        """Вопросы, отмеченные на удаление, не видны до окончания очистки"""
+        return query.where(Question.deleted_at.is_(None))
+
+    async def get_all(
+        self,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        sort: QuestionSort = QuestionSort.created_at
+    ) -> List[Question]:
+        """
+        Получить страницу вопросов (keyset-пагинация по (sort, id))
+
+        Args:
+            limit: Максимальное количество вопросов
+            after: Ключ (значение sort, id) последнего вопроса предыдущей страницы
+            sort: Поле сортировки
+
+        Returns:
+            Вопросы, отсортированные по убыванию поля sort
+        """
+        logger.info("Получение страницы вопросов (limit=%s, sort=%s)", limit, sort.value)
+        result = await self.db.execute(self._page(select(Question), limit, after, sort))
+        return list(result.scalars().all())
+
+    async def get_page_versions(
+        self,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        sort: QuestionSort = QuestionSort.created_at
+    ) -> List[Tuple[int, datetime]]:
+        """
+        Получить (id, updated_at) вопросов той же страницы, что и get_all
+
+        Args:
+            limit: Максимальное количество вопросов
+            after: Ключ (значение sort, id) последнего вопроса предыдущей страницы
+            sort: Поле сортировки
+
+        Returns:
+            Пары (ID, updated_at) в порядке страницы
+        """
         result = await self.db.execute(
-            select(Question).order_by(Question.created_at.desc())
+            self._page(select(Question.id, Question.updated_at), limit, after, sort)
         )
-        return list(result.scalars().all())
+        return [(question_id, updated_at) for question_id, updated_at in result.all()]
+
+    def _page(
+        self,
+        query: Select,
+        limit: int,
+        after: Optional[Tuple[Any, int]],
+        sort: QuestionSort
+    ) -> Select:
+        """Ограничить запрос страницей keyset-пагинации по (sort, id)"""
+        sort_column = getattr(Question, sort.value)
+        query = self._visible(query)
+        if after is not None:
+            query = query.filter(
+                tuple_(sort_column, Question.id) < tuple_(*after)
+            )
+        return query.order_by(sort_column.desc(), Question.id.desc()).limit(limit)
+
+    async def search(
+        self,
+        q: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Row]:
+        """
+        Полнотекстовый поиск по текстам вопросов и ответов
+
+        Args:
+            q: Поисковый запрос
+            limit: Максимальное количество вопросов
+            after: Ключ (rank, id) последнего вопроса предыдущей страницы
+
+        Returns:
+            Строки с колонками вопроса и rank, от более релевантных к менее
+        """
+        logger.info("Поиск вопросов (limit=%s)", limit)
+        ranked = ranked_question_ids(self.db.bind.dialect.name, q)
+        if ranked is None:
+            return []
+        query = self._visible(
+            select(*Question.__table__.columns, ranked.c.rank)
+            .join(ranked, ranked.c.question_id == Question.id)
+        )
+        if after is not None:
+            query = query.filter(tuple_(ranked.c.rank, Question.id) < tuple_(*after))
+        result = await self.db.execute(
+            query
+            .order_by(ranked.c.rank.desc(), Question.id.desc())
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def get_version_with_answers(
+        self,
+        question_id: int
+    ) -> Optional[Tuple[datetime, int]]:
+        """
+        Получить валидаторы вопроса с ответами без загрузки ORM-объектов
+
+        Ответы только создаются и удаляются, и каждое такое изменение
+        обновляет answer_count (и updated_at) вопроса.
+
+        Args:
+            question_id: ID вопроса
+
+        Returns:
+            updated_at и answer_count вопроса, либо None, если вопрос не найден
+        """
+        if self.cache is not None:
+            values = self.cache.get(self._cache_key(question_id))
+            if values is not None:
+                return values["updated_at"], values["answer_count"]
+
+        result = await self.db.execute(
+            self._visible(
+                select(Question.updated_at, Question.answer_count)
+                .filter(Question.id == question_id)
+            )
+        )
+        row = result.one_or_none()
+        return tuple(row) if row is not None else None
+
+    async def stream_chunks(self, chunk_size: int) -> AsyncIterator[List[Question]]:
+        """
+        Потоково читать все вопросы пачками через серверный курсор
+
+        Args:
+            chunk_size: Размер пачки
+
+        Yields:
+            Пачки вопросов, отсортированные по ID
+        """
+        logger.info("Потоковое чтение вопросов (chunk_size=%s)", chunk_size)
+        result = await self.db.stream_scalars(
+            self._visible(select(Question))
+            .order_by(Question.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for chunk in result.partitions(chunk_size):
+            yield list(chunk)
+
+    async def get_answers_for_questions(
+        self,
+        question_ids: Sequence[int]
+    ) -> Dict[int, List[Answer]]:
+        """
+        Получить ответы для пачки вопросов одним запросом
+
+        Args:
+            question_ids: ID вопросов
+
+        Returns:
+            Ответы, сгруппированные по ID вопроса
+        """
+        answers: Dict[int, List[Answer]] = {question_id: [] for question_id in question_ids}
+        if not question_ids:
+            return answers
+        result = await self.db.execute(
+            select(Answer)
+            .filter(Answer.question_id.in_(question_ids))
+            .order_by(Answer.question_id, Answer.id)
+        )
+        for answer in result.scalars():
+            answers[answer.question_id].append(answer)
+        return answers
+
+    async def get_by_id_with_answers(
+        self,
+        question_id: int,
+        answers_limit: int,
+        answers_after: Optional[Tuple[datetime, int]] = None
+    ) -> Optional[Tuple[Question, List[Answer], int]]:
+        """
+        Получить вопрос по ID с окном ответов (keyset-пагинация по created_at, id)
+
+        Args:
+            question_id: ID вопроса
+            answers_limit: Максимальное количество ответов
+            answers_after: Ключ (created_at, id) последнего ответа предыдущего окна
 
-    async def get_by_id_with_answers(self, question_id: int) -> Optional[Question]:
-        """Получить вопрос по ID с загрузкой ответов"""
-        logger.info(f"Получение вопроса с ID: {question_id} с ответами")
+        Returns:
+            Вопрос, ответы от старых к новым и общее число ответов,
+            либо None, если вопрос не найден
+        """
+        logger.info(
+            "Получение вопроса с ID: %s с ответами (limit=%s)", question_id, answers_limit
+        )
+        question = await self.get_by_id(question_id)
+        if question is None:
+            return None
+
+        query = select(Answer).filter(Answer.question_id == question_id)
+        if answers_after is not None:
+            query = query.filter(
+                tuple_(Answer.created_at, Answer.id) > tuple_(*answers_after)
+            )
         result = await self.db.execute(
-            select(Question)
-            .options(selectinload(Question.answers))
-            .filter(Question.id == question_id)
+            query
+            .order_by(Answer.created_at, Answer.id)
+            .limit(answers_limit)
         )
-        return result.scalar_one_or_none()
+        return question, list(result.scalars().all()), question.answer_count
 
     async def create(self, question_data: QuestionCreateSchema) -> Question:
         """Создать новый вопрос"""
         logger.info("Создание нового вопроса")
         try:
-            question = Question(text=question_data.text)
-            self.db.add(question)
-            await self.db.commit()
-            await self.db.refresh(question)
-            logger.info(f"Вопрос создан с ID: {question.id}")
+            question = await self.insert_one({"text": question_data.text})
+            logger.info("Вопрос создан с ID: %s", question.id)
             return question
         except Exception as e:
-            await self.db.rollback()
-            logger.error(f"Ошибка при создании вопроса: {str(e)}")
+            logger.error("Ошибка при создании вопроса: %s", e)
+            raise
+
+    async def create_many(self, questions_data: Sequence[QuestionCreateSchema]) -> List[Question]:
+        """
+        Создать пачку вопросов одним многострочным INSERT ... RETURNING
+
+        Args:
+            questions_data: Данные вопросов
+
+        Returns:
+            Созданные вопросы в порядке входных данных
+        """
+        logger.info("Пакетное создание %s вопросов", len(questions_data))
+        try:
+            questions = await self.insert_many(
+                [{"text": data.text} for data in questions_data]
+            )
+            logger.info("Создано вопросов: %s", len(questions))
+            return questions
+        except Exception as e:
+            logger.error("Ошибка при пакетном создании вопросов: %s", e)
             raise
 
     async def delete(self, question_id: int) -> bool:
-        """Удалить вопрос (каскадно удалятся все ответы)"""
-        logger.info(f"Удаление вопроса с ID: {question_id}")
+        """
+        Удалить вопрос одним DELETE (ответы удалит ON DELETE CASCADE в БД)
+
+        Args:
+            question_id: ID вопроса
+
+        Returns:
+            True если удалено, False если не найдено
+        """
+        answer_keys = await self._answer_stale_keys(question_id)
+        deleted = await super().delete(question_id)
+        if deleted:
+            self._invalidate_keys(answer_keys)
+        return deleted
+
+    async def _answer_stale_keys(self, question_id: int) -> List[StaleKey]:
+        """Ключи кэша ответов вопроса (запрос выполняется, только если кэш включен)"""
+        if self.cache is None:
+            return []
+        result = await self.db.execute(
+            select(Answer.id).filter(Answer.question_id == question_id)
+        )
+        return [(Answer.__tablename__, answer_id, None) for answer_id in result.scalars().all()]
+
+    async def mark_deleted(self, question_id: int) -> bool:
+        """
+        Отметить вопрос удаленным: он сразу перестает быть виден
+
+        Args:
+            question_id: ID вопроса
+
+        Returns:
+            True если отмечен, False если не найден или уже отмечен
+        """
+        logger.info("Отметка удаления вопроса с ID: %s", question_id)
+        # Ответы вопроса тоже перестают быть видны - их нужно убрать из кэша
+        answer_keys = await self._answer_stale_keys(question_id)
         try:
-            # Загружаем вопрос с ответами для каскадного удаления через ORM
             result = await self.db.execute(
-                select(Question)
-                .options(selectinload(Question.answers))
-                .filter(Question.id == question_id)
+                self._visible(update(Question).where(Question.id == question_id))
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Ошибка при отметке удаления вопроса с ID %s: %s", question_id, e)
+            raise
+        self._invalidate_keys([(*self._cache_key(question_id), None), *answer_keys])
+        return result.rowcount > 0
+
+    async def get_marked_deleted_ids(self) -> List[int]:
+        """ID вопросов, отмеченных на удаление и еще не очищенных, в порядке отметки"""
+        result = await self.db.execute(
+            select(Question.id)
+            .filter(Question.deleted_at.is_not(None))
+            .order_by(Question.deleted_at)
+        )
+        return list(result.scalars().all())
+
+    async def purge_answers_chunk(self, question_id: int, chunk_size: int) -> int:
+        """
+        Удалить порцию ответов вопроса отдельной короткой транзакцией
+
+        Args:
+            question_id: ID вопроса
+            chunk_size: Максимальное количество ответов в порции
+
+        Returns:
+            Количество удаленных ответов
+        """
+        chunk = (
+            select(Answer.id)
+            .filter(Answer.question_id == question_id)
+            .limit(chunk_size)
+            .scalar_subquery()
+        )
+        try:
+            result = await self.db.execute(
+                delete(Answer)
+                .where(Answer.id.in_(chunk))
+                .returning(Answer.id)
+                .execution_options(synchronize_session=False)
             )
-            question = result.scalar_one_or_none()
+            answer_ids = list(result.scalars().all())
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Ошибка при очистке ответов вопроса с ID %s: %s", question_id, e)
+            raise
+        self._invalidate_keys([(Answer.__tablename__, answer_id, None) for answer_id in answer_ids])
+        return len(answer_ids)
+
+    async def purge_deleted(self, question_id: int, chunk_size: int) -> int:
+        """
+        Удалить ответы отмеченного вопроса порциями, затем сам вопрос
 
-            if not question:
-                logger.warning(f"Вопрос с ID {question_id} не найден")
-                return False
+        Args:
+            question_id: ID вопроса, отмеченного mark_deleted
+            chunk_size: Максимальное количество ответов в одной транзакции
 
-            # Удаляем через ORM для работы каскадного удаления
-            await self.db.delete(question)
+        Returns:
+            Количество удаленных ответов
+        """
+        logger.info("Очистка удаленного вопроса с ID: %s", question_id)
+        purged = 0
+        while True:
+            removed = await self.purge_answers_chunk(question_id, chunk_size)
+            purged += removed
+            if removed < chunk_size:
+                break
+        try:
+            await self.db.execute(
+                delete(Question)
+                .where(Question.id == question_id, Question.deleted_at.is_not(None))
+                .execution_options(synchronize_session=False)
+            )
             await self.db.commit()
-            logger.info(f"Вопрос с ID {question_id} удален")
-            return True
         except Exception as e:
             await self.db.rollback()
-            logger.error(
-                f"Ошибка при удалении вопроса с ID {question_id}: {str(e)}"
+            logger.error("Ошибка при удалении вопроса с ID %s: %s", question_id, e)
+            raise
+        logger.info("Вопрос с ID %s очищен, удалено ответов: %s", question_id, purged)
+        return purged
+
+    async def recompute_answer_counts(self) -> int:
+        """
+        Пересчитать answer_count по таблице answers
+
+        Returns:
+            Количество исправленных вопросов
+        """
+        logger.info("Пересчет answer_count вопросов")
+        actual = (
+            select(func.count(Answer.id))
+            .filter(Answer.question_id == Question.id)
+            .scalar_subquery()
+        )
+        try:
+            result = await self.db.execute(
+                update(Question)
+                .where(Question.answer_count != actual)
+                .values(answer_count=actual)
+                .execution_options(synchronize_session=False)
             )
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error("Ошибка при пересчете answer_count: %s", e)
             raise
+        if result.rowcount:
+            # Какие именно вопросы исправлены, неизвестно - сбрасываем кэш целиком
+            self._clear_cache()
+        logger.info("Исправлено вопросов: %s", result.rowcount)
+        return result.rowcount
@@ -1,6 +1,7 @@
+from enum import Enum
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.domains.answers.schemas import AnswerResponseSchema
@@ -16,6 +17,7 @@ class QuestionCreateSchema(QuestionBaseSchema):
 
 class QuestionResponseSchema(QuestionBaseSchema):
     id: int
+    answer_count: int = 0
     created_at: datetime
     updated_at: datetime
 
@@ -25,6 +27,22 @@ class QuestionResponseSchema(QuestionBaseSchema):
 
 class QuestionWithAnswersSchema(QuestionResponseSchema):
     answers: List["AnswerResponseSchema"] = []
+    answers_total: int = 0
+    answers_next_cursor: Optional[str] = None
+
+
+class QuestionSearchResultSchema(QuestionResponseSchema):
+    rank: float
+
+
+class QuestionSort(str, Enum):
+    created_at = "created_at"
+    answer_count = "answer_count"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
 
 
 # Импортируем для правильной работы forward references
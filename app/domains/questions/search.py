@@ -0,0 +1,136 @@
+from typing import Optional
+
+from sqlalchemy import DDL, Float, Select, column, event, func, literal_column, select, table, union_all
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+
+# Конфигурация полнотекстового поиска PostgreSQL
+TS_CONFIG = "simple"
+
+# PostgreSQL: генерируемые tsvector-колонки с GIN-индексами
+POSTGRES_DDL = {
+    Question.__table__: [
+        f"ALTER TABLE questions ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}', text)) STORED",
+        "CREATE INDEX ix_questions_search_vector ON questions USING gin (search_vector)",
+    ],
+    Answer.__table__: [
+        f"ALTER TABLE answers ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}', text)) STORED",
+        "CREATE INDEX ix_answers_search_vector ON answers USING gin (search_vector)",
+    ],
+}
+
+# SQLite: FTS5-таблицы (rowid = ID строки), синхронизируемые триггерами
+SQLITE_DDL = {
+    Question.__table__: [
+        "CREATE VIRTUAL TABLE questions_fts USING fts5(text)",
+        "CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN "
+        "INSERT INTO questions_fts(rowid, text) VALUES (new.id, new.text); END",
+        "CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN "
+        "DELETE FROM questions_fts WHERE rowid = old.id; END",
+    ],
+    Answer.__table__: [
+        "CREATE VIRTUAL TABLE answers_fts USING fts5(text, question_id UNINDEXED)",
+        "CREATE TRIGGER answers_fts_insert AFTER INSERT ON answers BEGIN "
+        "INSERT INTO answers_fts(rowid, text, question_id) "
+        "VALUES (new.id, new.text, new.question_id); END",
+        "CREATE TRIGGER answers_fts_delete AFTER DELETE ON answers BEGIN "
+        "DELETE FROM answers_fts WHERE rowid = old.id; END",
+    ],
+}
+
+SQLITE_DROP_DDL = {
+    Question.__table__: "DROP TABLE IF EXISTS questions_fts",
+    Answer.__table__: "DROP TABLE IF EXISTS answers_fts",
+}
+
+for _table, _statements in POSTGRES_DDL.items():
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+for _table, _statements in SQLITE_DDL.items():
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        _table,
+        "before_drop",
+        DDL(SQLITE_DROP_DDL[_table]).execute_if(dialect="sqlite")
+    )
+
+questions_fts = table("questions_fts", column("rowid"), column("text"))
+answers_fts = table("answers_fts", column("rowid"), column("text"), column("question_id"))
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """
+    Преобразовать пользовательский запрос в запрос FTS5
+
+    Каждое слово берется в кавычки, чтобы операторы FTS5 в тексте
+    запроса не интерпретировались; слова объединяются через AND.
+    """
+    terms = [f'"{term.replace(chr(34), chr(34) * 2)}"' for term in q.split()]
+    return " ".join(terms) or None
+
+
+def _postgres_matches(q: str) -> Select:
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    question_vector = literal_column("questions.search_vector")
+    answer_vector = literal_column("answers.search_vector")
+    return union_all(
+        select(
+            Question.id.label("question_id"),
+            func.ts_rank(question_vector, tsquery).label("rank")
+        )
+        .select_from(Question)
+        .filter(question_vector.op("@@")(tsquery)),
+        select(
+            Answer.question_id.label("question_id"),
+            func.ts_rank(answer_vector, tsquery).label("rank")
+        )
+        .select_from(Answer)
+        .filter(answer_vector.op("@@")(tsquery))
+    )
+
+
+def _sqlite_matches(query: str) -> Select:
+    # bm25 тем меньше, чем релевантнее документ - меняем знак
+    return union_all(
+        select(
+            questions_fts.c.rowid.label("question_id"),
+            (-func.bm25(literal_column("questions_fts"))).label("rank")
+        )
+        .filter(literal_column("questions_fts").op("MATCH")(query)),
+        select(
+            answers_fts.c.question_id.label("question_id"),
+            (-func.bm25(literal_column("answers_fts"))).label("rank")
+        )
+        .filter(literal_column("answers_fts").op("MATCH")(query))
+    )
+
+
+def ranked_question_ids(dialect_name: str, q: str):
+    """
+    Подзапрос (question_id, rank) по совпадениям в вопросах и их ответах
+
+    Ранг вопроса - лучший ранг среди его текста и текстов ответов.
+
+    Returns:
+        Подзапрос или None, если запрос не содержит слов
+    """
+    if dialect_name == "postgresql":
+        matches = _postgres_matches(q).subquery()
+    else:
+        query = fts5_query(q)
+        if query is None:
+            return None
+        matches = _sqlite_matches(query).subquery()
+
+    rank: ColumnElement = func.max(matches.c.rank).cast(Float)
+    return (
+        select(matches.c.question_id, rank.label("rank"))
+        .group_by(matches.c.question_id)
+        .subquery("ranked")
+    )
@@ -1,35 +1,294 @@
-from typing import List
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker
 
+from app.core.cache import EntityCache
+from app.core.etag import make_etag
+from app.core.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from app.core.schemas import BatchItemErrorSchema, BatchResultSchema, batch_item_error
+from app.core.serialization import validate_many
+from app.core.single_flight import SingleFlight
 from app.domains.questions.repository import QuestionRepository
 from app.domains.questions.schemas import (
+    ExportFormat,
     QuestionCreateSchema,
     QuestionResponseSchema,
+    QuestionSearchResultSchema,
+    QuestionSort,
     QuestionWithAnswersSchema
 )
+from app.utils.config import settings
+
+T = TypeVar("T")
+
+CSV_QUESTION_FIELDS = ["id", "text", "created_at", "updated_at"]
+
+# Тип первого элемента ключа курсора для каждого поля сортировки
+SORT_CURSOR_TYPES = {
+    QuestionSort.created_at: datetime,
+    QuestionSort.answer_count: int,
+}
+CSV_ANSWER_FIELDS = ["answer_id", "answer_user_id", "answer_text", "answer_created_at"]
 
 
 class QuestionService:
     """Сервис для работы с вопросами (бизнес-логика)"""
 
-    def __init__(self, repository: QuestionRepository):
+    def __init__(self, repository: QuestionRepository, reads: Optional[SingleFlight] = None):
         self.repository = repository
+        # Объединение одинаковых конкурентных чтений (None - каждый запрос в БД)
+        self.reads = reads
+
+    async def _coalesced(self, key: Tuple, load: Callable[[], Awaitable[T]]) -> T:
+        """Выполнить чтение через single flight, если он включен"""
+        if self.reads is None:
+            return await load()
+        # Движок в ключе: чтение с primary не ждет результата с отстающей реплики
+        return await self.reads.do((self.repository.db.bind,) + key, load)
 
-    async def get_all_questions(self) -> List[QuestionResponseSchema]:
-        """Получить список всех вопросов"""
-        questions = await self.repository.get_all()
-        return [QuestionResponseSchema.model_validate(question) for question in questions]
+    async def get_questions_etag(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: QuestionSort = QuestionSort.created_at
+    ) -> str:
+        """ETag страницы вопросов по (id, updated_at) ее строк - без загрузки самих вопросов"""
+        after = self._decode_list_cursor(cursor, sort)
+        versions = await self.repository.get_page_versions(limit + 1, after, sort)
+        return self._page_etag(versions, limit, cursor, sort)
 
-    async def get_question_by_id(self, question_id: int) -> QuestionWithAnswersSchema:
-        """Получить вопрос по ID с проверкой существования"""
-        question = await self.repository.get_by_id_with_answers(question_id)
-        if not question:
+    @staticmethod
+    def _page_etag(
+        versions: List[Tuple[int, datetime]],
+        limit: int,
+        cursor: Optional[str],
+        sort: QuestionSort
+    ) -> str:
+        """ETag страницы по (id, updated_at) ее строк и наличию следующей страницы"""
+        return make_etag(
+            "questions", versions[:limit], len(versions) > limit, limit, cursor, sort.value
+        )
+
+    @staticmethod
+    def _decode_list_cursor(cursor: Optional[str], sort: QuestionSort) -> Optional[Tuple[Any, int]]:
+        """Разобрать курсор списка вопросов (400 при некорректном курсоре)"""
+        if cursor is None:
+            return None
+        try:
+            return decode_cursor(cursor, SORT_CURSOR_TYPES[sort], int)
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    async def get_question_etag(
+        self,
+        question_id: int,
+        answers_limit: int,
+        answers_cursor: Optional[str] = None
+    ) -> Optional[str]:
+        """ETag вопроса с окном ответов (None, если вопрос не найден)"""
+        version = await self._coalesced(
+            ("question_version", question_id),
+            lambda: self.repository.get_version_with_answers(question_id)
+        )
+        if version is None:
+            return None
+        return make_etag("question", question_id, *version, answers_limit, answers_cursor)
+
+    async def get_all_questions(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: QuestionSort = QuestionSort.created_at
+    ) -> Tuple[List[QuestionResponseSchema], Optional[str], str]:
+        """Получить страницу вопросов, курсор следующей страницы и ETag страницы"""
+        after = self._decode_list_cursor(cursor, sort)
+
+        # Запрашиваем на одну строку больше, чтобы узнать о следующей странице
+        questions = await self.repository.get_all(limit + 1, after, sort)
+        etag = self._page_etag(
+            [(question.id, question.updated_at) for question in questions], limit, cursor, sort
+        )
+        next_cursor = None
+        if len(questions) > limit:
+            questions = questions[:limit]
+            last = questions[-1]
+            next_cursor = encode_cursor(getattr(last, sort.value), last.id)
+        return (
+            validate_many(QuestionResponseSchema, questions),
+            next_cursor,
+            etag
+        )
+
+    async def search_questions(
+        self,
+        q: str,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[QuestionSearchResultSchema], Optional[str]]:
+        """Найти вопросы по тексту вопросов и ответов (страница и курсор)"""
+        after = None
+        if cursor is not None:
+            try:
+                after = decode_cursor(cursor, float, int)
+            except InvalidCursorError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+        # Запрашиваем на одну строку больше, чтобы узнать о следующей странице
+        rows = await self.repository.search(q, limit + 1, after)
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+        return validate_many(QuestionSearchResultSchema, rows), next_cursor
+
+    async def export_questions(
+        self,
+        export_format: ExportFormat,
+        include_answers: bool = False
+    ) -> AsyncIterator[str]:
+        """
+        Потоково выгрузить все вопросы (и, опционально, ответы)
+
+        Args:
+            export_format: Формат выгрузки (ndjson или csv)
+            include_answers: Добавлять ли ответы к вопросам
+
+        Yields:
+            Фрагменты выгрузки, по одному на пачку вопросов
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.csv:
+            header = CSV_QUESTION_FIELDS + (CSV_ANSWER_FIELDS if include_answers else [])
+            writer.writerow(header)
+            yield self._drain(buffer)
+
+        async for chunk in self.repository.stream_chunks(settings.export_chunk_size):
+            answers = {}
+            if include_answers:
+                answers = await self.repository.get_answers_for_questions(
+                    [question.id for question in chunk]
+                )
+
+            for question in chunk:
+                if export_format == ExportFormat.ndjson:
+                    if include_answers:
+                        schema = self._with_answers(
+                            question, answers[question.id], len(answers[question.id])
+                        )
+                    else:
+                        schema = QuestionResponseSchema.model_validate(question)
+                    buffer.write(schema.model_dump_json())
+                    buffer.write("\n")
+                    continue
+
+                row = [
+                    question.id,
+                    question.text,
+                    question.created_at.isoformat(),
+                    question.updated_at.isoformat()
+                ]
+                if not include_answers:
+                    writer.writerow(row)
+                    continue
+                if not answers[question.id]:
+                    writer.writerow(row + [""] * len(CSV_ANSWER_FIELDS))
+                for answer in answers[question.id]:
+                    writer.writerow(row + [
+                        answer.id,
+                        answer.user_id,
+                        answer.text,
+                        answer.created_at.isoformat()
+                    ])
+            yield self._drain(buffer)
+
+    @staticmethod
+    def _with_answers(
+        question: Any,
+        answers: List[Any],
+        answers_total: int,
+        answers_next_cursor: Optional[str] = None
+    ) -> QuestionWithAnswersSchema:
+        """Собрать вопрос с ответами одним проходом валидации"""
+        # Связь question.answers не читается: в async-сессии она не загружена
+        return QuestionWithAnswersSchema.model_validate(
+            {
+                **{field: getattr(question, field) for field in QuestionResponseSchema.model_fields},
+                "answers": answers,
+                "answers_total": answers_total,
+                "answers_next_cursor": answers_next_cursor,
+            },
+            from_attributes=True
+        )
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> str:
+        """Забрать накопленный текст из буфера и очистить его"""
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    async def get_question_by_id(
+        self,
+        question_id: int,
+        answers_limit: int = settings.default_page_size,
+        answers_cursor: Optional[str] = None
+    ) -> QuestionWithAnswersSchema:
+        """Получить вопрос по ID с окном ответов и проверкой существования"""
+        answers_after = None
+        if answers_cursor is not None:
+            try:
+                answers_after = decode_cursor(answers_cursor, datetime, int)
+            except InvalidCursorError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+
+        question = await self._coalesced(
+            ("question", question_id, answers_limit, answers_after),
+            lambda: self._load_question(question_id, answers_limit, answers_after)
+        )
+        if question is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Question with ID {question_id} not found"
             )
-        return QuestionWithAnswersSchema.model_validate(question)
+        return question
+
+    async def _load_question(
+        self,
+        question_id: int,
+        answers_limit: int,
+        answers_after: Optional[Tuple[datetime, int]]
+    ) -> Optional[QuestionWithAnswersSchema]:
+        """Загрузить вопрос с окном ответов (None, если вопрос не найден)"""
+        # Запрашиваем на один ответ больше, чтобы узнать о следующем окне
+        found = await self.repository.get_by_id_with_answers(
+            question_id, answers_limit + 1, answers_after
+        )
+        if not found:
+            return None
+        question, answers, answers_total = found
+
+        answers_next_cursor = None
+        if len(answers) > answers_limit:
+            answers = answers[:answers_limit]
+            last = answers[-1]
+            answers_next_cursor = encode_cursor(last.created_at, last.id)
+        return self._with_answers(question, answers, answers_total, answers_next_cursor)
 
     async def create_question(self, question_data: QuestionCreateSchema) -> QuestionResponseSchema:
         """Создать новый вопрос"""
@@ -47,12 +306,115 @@ class QuestionService:
                 detail="Database connection error"
             )
 
-    async def delete_question(self, question_id: int) -> None:
-        """Удалить вопрос с проверкой существования"""
-        # Удаляем вопрос
-        deleted = await self.repository.delete(question_id)
+    async def create_questions_batch(
+        self,
+        items: List[Any]
+    ) -> BatchResultSchema[QuestionResponseSchema]:
+        """
+        Создать пачку вопросов в одной транзакции
+
+        Невалидные элементы не прерывают пакет, а возвращаются в errors
+        с индексом во входном списке.
+        """
+        if len(items) > settings.max_batch_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Batch size exceeds the limit of {settings.max_batch_size} items"
+            )
+
+        valid: List[QuestionCreateSchema] = []
+        errors: List[BatchItemErrorSchema] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append(QuestionCreateSchema.model_validate(item))
+            except ValidationError as e:
+                errors.append(batch_item_error(index, e))
+
+        try:
+            questions = await self.repository.create_many(valid)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Data integrity error when creating questions"
+            )
+        except OperationalError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Database connection error"
+            )
+        return BatchResultSchema[QuestionResponseSchema](
+            created=validate_many(QuestionResponseSchema, questions),
+            errors=errors
+        )
+
+    async def delete_question(self, question_id: int) -> bool:
+        """
+        Удалить вопрос с проверкой существования
+
+        Вопрос, у которого ответов больше settings.question_purge_threshold,
+        только отмечается удаленным: его ответы очищаются порциями в фоне
+        (purge_deleted_question), чтобы не держать одну долгую транзакцию.
+
+        Returns:
+            True, если удаление отложено и нужна фоновая очистка
+        """
+        version = await self.repository.get_version_with_answers(question_id)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Question with ID {question_id} not found"
+            )
+
+        _, answer_count = version
+        if answer_count > settings.question_purge_threshold:
+            deleted = await self.repository.mark_deleted(question_id)
+            scheduled = True
+        else:
+            deleted = await self.repository.delete(question_id)
+            scheduled = False
         if not deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Question with ID {question_id} not found"
             )
+        return scheduled
+
+
+async def purge_deleted_question(
+    session_factory: async_sessionmaker,
+    cache: Optional[EntityCache],
+    question_id: int,
+    chunk_size: int = settings.question_purge_chunk_size
+) -> int:
+    """
+    Фоновая очистка вопроса, отмеченного на удаление
+
+    Выполняется после ответа на запрос, поэтому открывает собственную сессию.
+    Ошибка не теряет вопрос: он остается отмеченным и будет очищен
+    повторно командой purge-deleted-questions.
+
+    Returns:
+        Количество удаленных ответов
+    """
+    async with session_factory() as session:
+        return await QuestionRepository(session, cache).purge_deleted(question_id, chunk_size)
+
+
+async def stream_questions_export(
+    session_factory: async_sessionmaker,
+    export_format: ExportFormat,
+    include_answers: bool = False
+) -> AsyncIterator[str]:
+    """
+    Потоковая выгрузка вопросов в собственной сессии
+
+    Тело ответа читается после завершения обработчика запроса, когда
+    сессия запроса может быть уже закрыта, поэтому выгрузка открывает свою.
+
+    Yields:
+        Фрагменты выгрузки, по одному на пачку вопросов
+    """
+    async with session_factory() as session:
+        service = QuestionService(QuestionRepository(session))
+        async for chunk in service.export_questions(export_format, include_answers):
+            yield chunk
@@ -6,11 +6,12 @@ from app.utils.logger import setup_logging
 from app.core.exceptions import http_exception_handler, validation_exception_handler
 from app.core.lifespan import lifespan
 from app.core.middleware import setup_middleware
+from app.core.serialization import FastJSONResponse
 from app.api.base import base_router
 from app.api.v1 import api_router
 
 # Настройка логирования
-setup_logging()
+setup_logging(settings.log_level, settings.log_json)
 
 
 # Создание приложения
@@ -18,7 +19,8 @@ app = FastAPI(
     title=settings.project_name,
     version=settings.api_version,
     description="API-сервис для вопросов и ответов",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # Настройка middleware
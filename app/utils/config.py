@@ -9,6 +9,85 @@ class Settings(BaseSettings):
     debug: bool = False
     cors_origins: List[str] = ["*"]
 
+    # Пул соединений и драйвер БД
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+    db_pgbouncer_mode: bool = False
+
+    # Реплики только для чтения (GET-запросы); пусто - все читают с primary
+    database_replica_urls: List[str] = []
+    # Сколько секунд после своей записи клиент читает с primary (0 - отключить)
+    read_your_writes_window: float = 2.0
+
+    # Логирование
+    log_level: str = "INFO"
+    log_json: bool = True
+    # Доля запросов, для которых пишутся INFO-логи (WARNING и выше - всегда)
+    log_sample_rate: float = 0.1
+
+    # Метрики
+    metrics_enabled: bool = True
+
+    # Сжатие ответов (gzip, deflate, br при установленном brotli)
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
+    compression_level: int = 6
+    # Кэш уже сжатых тел по версии ресурса (ETag)
+    compression_cache_maxsize: int = 256
+    compression_cache_ttl: float = 300.0
+
+    # Пагинация
+    default_page_size: int = 20
+    max_page_size: int = 100
+
+    # Пакетное создание
+    max_batch_size: int = 1000
+
+    # Экспорт
+    export_chunk_size: int = 1000
+
+    # Контроль допуска: лимит одновременных запросов (0 - суммарный размер пулов primary
+    # и реплик; в режиме PgBouncer лимит обязателен), очередь ожидания и ее таймаут, с;
+    # при переполнении - 503
+    admission_enabled: bool = False
+    admission_concurrency_limit: int = 0
+    admission_queue_size: int = 100
+    admission_queue_timeout: float = 1.0
+    admission_exempt_paths: List[str] = ["/health", "/metrics"]
+
+    # Ограничение частоты запросов клиента, запросов/с (0 - отключено); при превышении - 429
+    rate_limit_per_client: float = 0.0
+    rate_limit_burst: int = 20
+    rate_limit_max_clients: int = 10000
+
+    # Групповая фиксация создания ответов: пачка до max_items или max_delay секунд
+    answer_write_batching_enabled: bool = False
+    answer_write_batch_max_items: int = 100
+    answer_write_batch_max_delay: float = 0.005
+
+    # Объединение одинаковых конкурентных чтений вопроса (single flight);
+    # окно раздачи готового результата, с (0 - только во время загрузки)
+    single_flight_enabled: bool = True
+    single_flight_share_window: float = 0.0
+    single_flight_share_maxsize: int = 1024
+
+    # Удаление вопросов: при большем числе ответов - отметка и фоновая очистка
+    question_purge_threshold: int = 10000
+    question_purge_chunk_size: int = 1000
+
+    # Кэш сущностей
+    entity_cache_enabled: bool = True
+    entity_cache_maxsize: int = 10000
+    entity_cache_ttl: float = 60.0
+    # Шина инвалидации кэша между воркерами: none, unix (один хост) или postgres (LISTEN/NOTIFY)
+    cache_invalidation_transport: str = "none"
+    cache_invalidation_socket_dir: str = "/tmp/que_ans_invalidation"
+    cache_invalidation_channel: str = "entity_cache_invalidation"
+
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -0,0 +1,239 @@
+"""
+Генератор синтетических данных и массовая загрузка в обход ORM
+
+Данные детерминированы seed: одинаковые параметры дают одинаковые строки.
+Число ответов на вопрос распределено по Парето (немногие вопросы собирают
+большую часть ответов), длина текста ответа - логнормально.
+"""
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, List, Sequence, Tuple
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ограничения схем QuestionBaseSchema и AnswerBaseSchema
+QUESTION_MAX_LENGTH = 200
+ANSWER_MAX_LENGTH = 10000
+
+QUESTION_COLUMNS = ("id", "text", "answer_count", "created_at", "updated_at")
+ANSWER_COLUMNS = ("question_id", "user_id", "text", "created_at", "updated_at")
+
+WORDS = (
+    "как почему когда где что лучше быстрее запрос ответ база данных индекс "
+    "сервер клиент кэш очередь поток память диск сеть задержка нагрузка python "
+    "postgres sqlite fastapi asyncio транзакция блокировка реплика пул соединение"
+).split()
+
+# Начало временного диапазона created_at
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Параметры синтетического набора данных"""
+
+    questions: int
+    answers: int
+    seed: int = 42
+    # Показатель Парето: чем меньше, тем сильнее перекос ответов по вопросам
+    skew: float = 1.2
+    users: int = 10000
+    # Логнормальная длина текста ответа: медиана и sigma
+    answer_length_median: int = 300
+    answer_length_sigma: float = 1.0
+    # Диапазон дат создания вопросов
+    days: int = 365
+
+
+@dataclass
+class LoadStats:
+    """Результат загрузки одной таблицы"""
+
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else float("inf")
+
+
+class DatasetGenerator:
+    """Детерминированный генератор строк вопросов и ответов"""
+
+    def __init__(self, spec: DatasetSpec, first_question_id: int = 1):
+        self.spec = spec
+        self.first_question_id = first_question_id
+        rng = random.Random(spec.seed)
+        # Общий текст, из которого берутся фрагменты нужной длины
+        corpus: List[str] = []
+        length = 0
+        while length < ANSWER_MAX_LENGTH * 2:
+            word = rng.choice(WORDS)
+            corpus.append(word)
+            length += len(word) + 1
+        self._corpus = " ".join(corpus)
+        self._answer_counts = self._distribute_answers(rng)
+
+    def _distribute_answers(self, rng: random.Random) -> List[int]:
+        """Число ответов каждого вопроса (сумма равна spec.answers)"""
+        counts = [0] * self.spec.questions
+        if not counts:
+            return counts
+        weights = [rng.paretovariate(self.spec.skew) for _ in counts]
+        cum_weights = list(itertools.accumulate(weights))
+        population = range(self.spec.questions)
+        remaining = self.spec.answers
+        while remaining:
+            chunk = min(remaining, 100_000)
+            for index in rng.choices(population, cum_weights=cum_weights, k=chunk):
+                counts[index] += 1
+            remaining -= chunk
+        return counts
+
+    def _text(self, rng: random.Random, length: int) -> str:
+        start = rng.randrange(len(self._corpus) - length)
+        return self._corpus[start:start + length].strip() or "?"
+
+    def _answer_length(self, rng: random.Random) -> int:
+        length = rng.lognormvariate(
+            math.log(self.spec.answer_length_median), self.spec.answer_length_sigma
+        )
+        return max(1, min(ANSWER_MAX_LENGTH, int(length)))
+
+    def question_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Строки вопросов в порядке QUESTION_COLUMNS"""
+        rng = random.Random(f"{self.spec.seed}:questions")
+        span = self.spec.days * 86400
+        for index, answer_count in enumerate(self._answer_counts):
+            created_at = BASE_TIME + timedelta(seconds=span * index // max(self.spec.questions, 1))
+            yield (
+                self.first_question_id + index,
+                self._text(rng, rng.randint(10, QUESTION_MAX_LENGTH)),
+                answer_count,
+                created_at,
+                created_at,
+            )
+
+    def answer_rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Строки ответов в порядке ANSWER_COLUMNS, сгруппированные по вопросам"""
+        rng = random.Random(f"{self.spec.seed}:answers")
+        span = self.spec.days * 86400
+        for index, answer_count in enumerate(self._answer_counts):
+            question_id = self.first_question_id + index
+            asked_at = BASE_TIME + timedelta(seconds=span * index // max(self.spec.questions, 1))
+            for _ in range(answer_count):
+                created_at = asked_at + timedelta(seconds=rng.randint(1, 30 * 86400))
+                yield (
+                    question_id,
+                    rng.randint(1, self.spec.users),
+                    self._text(rng, self._answer_length(rng)),
+                    created_at,
+                    created_at,
+                )
+
+
+def chunked(rows: Iterator[Tuple[Any, ...]], size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """Разбить поток строк на списки не длиннее size"""
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _copy_rows(
+    conn: AsyncConnection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterator[Tuple[Any, ...]],
+    chunk_size: int
+) -> int:
+    """PostgreSQL: COPY через asyncpg (copy_records_to_table)"""
+    raw = await conn.get_raw_connection()
+    driver_connection = raw.driver_connection
+    loaded = 0
+    for chunk in chunked(rows, chunk_size):
+        await driver_connection.copy_records_to_table(table, records=chunk, columns=list(columns))
+        loaded += len(chunk)
+    return loaded
+
+
+async def _executemany_rows(
+    conn: AsyncConnection,
+    table,
+    columns: Sequence[str],
+    rows: Iterator[Tuple[Any, ...]],
+    chunk_size: int
+) -> int:
+    """Прочие СУБД (SQLite): Core INSERT с executemany порциями"""
+    loaded = 0
+    for chunk in chunked(rows, chunk_size):
+        await conn.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+        loaded += len(chunk)
+    return loaded
+
+
+async def load_dataset(
+    engine: AsyncEngine,
+    spec: DatasetSpec,
+    chunk_size: int = 10000
+) -> List[LoadStats]:
+    """
+    Сгенерировать и загрузить набор данных в одной транзакции
+
+    ID вопросов продолжают уже существующие, поэтому загрузка возможна
+    в непустую БД.
+
+    Args:
+        engine: Асинхронный движок целевой БД
+        spec: Параметры набора данных
+        chunk_size: Строк в одной порции COPY / executemany
+
+    Returns:
+        Статистика загрузки по таблицам
+    """
+    postgres = engine.dialect.name == "postgresql"
+    stats: List[LoadStats] = []
+    async with engine.begin() as conn:
+        max_id = await conn.scalar(select(func.coalesce(func.max(Question.id), 0)))
+        generator = DatasetGenerator(spec, first_question_id=max_id + 1)
+        logger.info(
+            "Загрузка набора данных: %s вопросов, %s ответов (seed=%s)",
+            spec.questions, spec.answers, spec.seed
+        )
+
+        for table, columns, rows in (
+            (Question.__table__, QUESTION_COLUMNS, generator.question_rows()),
+            (Answer.__table__, ANSWER_COLUMNS, generator.answer_rows()),
+        ):
+            started = time.perf_counter()
+            if postgres:
+                loaded = await _copy_rows(conn, table.name, columns, rows, chunk_size)
+            else:
+                loaded = await _executemany_rows(conn, table, columns, rows, chunk_size)
+            stats.append(LoadStats(table.name, loaded, time.perf_counter() - started))
+            logger.info(
+                "Таблица %s: %s строк, %.0f строк/с",
+                table.name, loaded, stats[-1].rows_per_second
+            )
+
+        if postgres:
+            # COPY с явными ID не двигает последовательность
+            await conn.execute(text(
+                "SELECT setval(pg_get_serial_sequence('questions', 'id'), "
+                "(SELECT max(id) FROM questions))"
+            ))
+    return stats
+
@@ -1,18 +1,123 @@
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Tuple
 
+# Контекст текущего запроса: ID и попал ли запрос в выборку INFO-логов
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+log_sampled_var: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирование записей лога в одну строку JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            payload["request_id"] = request_id
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class RequestSamplingFilter(logging.Filter):
+    """
+    Пропускает INFO/DEBUG-записи только для запросов, попавших в выборку
+
+    Записи уровня WARNING и выше проходят всегда. Заодно добавляет
+    к записи ID запроса - фильтр работает в потоке, где создана запись.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return record.levelno > logging.INFO or log_sampled_var.get()
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """QueueHandler, который подставляет аргументы в вызывающем потоке"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Как QueueHandler.prepare: аргументы подставляются сразу, иначе поток
+        # QueueListener увидит объекты, измененные после вызова логгера. JSON
+        # и вывод в stdout по-прежнему строит поток QueueListener
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = "INFO", json_format: bool = True) -> None:
+    """
+    Настройка логирования через очередь
+
+    Вызывающий код только кладет запись в очередь; форматирование и запись
+    в stdout выполняет отдельный поток QueueListener.
+    """
+    global _listener
+    shutdown_logging()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        JsonFormatter() if json_format
+        else logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    )
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _ThreadQueueHandler(log_queue)
+    queue_handler.addFilter(RequestSamplingFilter())
 
-def setup_logging(level: str = "INFO") -> None:
-    """Настройка логирования"""
     logging.basicConfig(
         level=getattr(logging, level.upper()),
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
+        handlers=[queue_handler],
+        force=True
     )
 
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Остановить поток логирования, дописав записи из очереди"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def bind_request(request_id: str, sampled: bool) -> Tuple[object, object]:
+    """Привязать ID запроса и решение о выборке к текущему контексту"""
+    return request_id_var.set(request_id), log_sampled_var.set(sampled)
+
+
+def unbind_request(tokens: Tuple[object, object]) -> None:
+    """Сбросить контекст запроса"""
+    request_id_token, sampled_token = tokens
+    request_id_var.reset(request_id_token)
+    log_sampled_var.reset(sampled_token)
+
 
 def get_logger(name: str) -> logging.Logger:
     """Получить логгер"""
     return logging.getLogger(name)
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,80 @@
+"""
+Сравнение сериализации страницы GET /questions/: прежний путь против быстрого
+
+Запуск:
+    python -m benchmarks.bench_serialization [--rows 100] [--repeat 2000]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.schemas import PaginatedResponse
+from app.core.serialization import envelope, validate_many
+from app.domains.answers.model import Answer  # noqa
+from app.domains.questions.model import Question
+from app.domains.questions.schemas import QuestionResponseSchema
+
+
+def make_questions(rows: int):
+    """Транзиентные ORM-объекты, как их возвращает репозиторий"""
+    now = datetime.now(timezone.utc)
+    return [
+        Question(
+            id=i,
+            text=f"Вопрос номер {i}: какой язык программирования лучше?",
+            answer_count=i % 7,
+            created_at=now - timedelta(seconds=i),
+            updated_at=now - timedelta(seconds=i)
+        )
+        for i in range(rows, 0, -1)
+    ]
+
+
+# Так FastAPI проверяет и сериализует возврат эндпоинта через response_model
+response_adapter = TypeAdapter(PaginatedResponse[QuestionResponseSchema])
+
+
+def legacy_path(questions):
+    """model_validate на каждый объект + повторная валидация response_model + JSONResponse"""
+    data = [QuestionResponseSchema.model_validate(question) for question in questions]
+    payload = PaginatedResponse(
+        message="Questions retrieved successfully",
+        data=data,
+        next_cursor="cursor"
+    )
+    # FastAPI: model_dump возврата, валидация по response_model, сериализация в JSON-типы
+    validated = response_adapter.validate_python(payload.model_dump())
+    content = response_adapter.dump_python(validated, mode="json")
+    return JSONResponse(content).body
+
+
+def fast_path(questions):
+    """Один проход TypeAdapter по списку + конверт, сериализованный один раз через orjson"""
+    data = validate_many(QuestionResponseSchema, questions)
+    return envelope(
+        "Questions retrieved successfully",
+        data,
+        next_cursor="cursor"
+    ).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100, help="Вопросов на странице")
+    parser.add_argument("--repeat", type=int, default=2000, help="Повторов на замер")
+    args = parser.parse_args()
+
+    questions = make_questions(args.rows)
+    results = {}
+    for name, func in (("legacy", legacy_path), ("fast", fast_path)):
+        best = min(timeit.repeat(lambda: func(questions), number=args.repeat, repeat=5))
+        results[name] = best / args.repeat
+        print(f"{name:>8}: {results[name] * 1e6:9.1f} мкс/страница ({args.rows} строк)")
+    print(f" speedup: {results['legacy'] / results['fast']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
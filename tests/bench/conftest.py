@@ -0,0 +1,161 @@
+"""
+Микробенчмарки слоев приложения на заполненной SQLite
+
+Запуск (размеры набора данных - через BENCH_ROWS, по умолчанию 1000):
+    BENCH_ROWS=1000,100000,1000000 pytest tests/bench --benchmark-only --benchmark-autosave
+    pytest tests/bench --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:10%
+
+Без --benchmark-only бенчмарки пропускаются, чтобы не замедлять обычный прогон тестов.
+"""
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, List
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from app.core.database import Base, enable_sqlite_foreign_keys, make_sessionmaker
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+import app.domains.questions.search  # noqa: F401 - FTS-таблицы создаются вместе со схемой
+
+DATASET_DIR = Path(__file__).resolve().parents[2] / ".benchmarks" / "datasets"
+# Вопрос с длинным списком ответов для get_by_id_with_answers
+HOT_QUESTION_ID = 1
+HOT_QUESTION_ANSWERS = 200
+SEED_CHUNK_SIZE = 50_000
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def schema_hash() -> str:
+    """Хэш DDL схемы: после изменения моделей набор данных создается заново"""
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(str(CreateTable(table).compile(dialect=sqlite.dialect())))
+        statements.extend(
+            str(CreateIndex(index).compile(dialect=sqlite.dialect()))
+            for index in sorted(table.indexes, key=lambda index: index.name)
+        )
+    return hashlib.sha1("\n".join(statements).encode()).hexdigest()[:12]
+
+
+def bench_sizes() -> List[int]:
+    """Размеры наборов данных из BENCH_ROWS"""
+    return [int(value) for value in os.getenv("BENCH_ROWS", "1000").split(",") if value]
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmark_only", False):
+        return
+    skip = pytest.mark.skip(reason="бенчмарки запускаются с --benchmark-only")
+    for item in items:
+        if BENCH_DIR in Path(str(item.fspath)).resolve().parents:
+            item.add_marker(skip)
+
+
+def pytest_generate_tests(metafunc):
+    if "dataset" in metafunc.fixturenames:
+        metafunc.parametrize(
+            "dataset", bench_sizes(), indirect=True, ids=lambda rows: f"{rows}rows"
+        )
+
+
+@dataclass
+class Dataset:
+    """Заполненная БД и event loop, в котором с ней работают бенчмарки"""
+
+    rows: int
+    engine: AsyncEngine
+    sessionmaker: async_sessionmaker
+    loop: asyncio.AbstractEventLoop
+
+    def run(self, coro_factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Выполнить корутину в loop набора данных"""
+        return self.loop.run_until_complete(coro_factory())
+
+
+def _question_rows(start: int, stop: int) -> List[dict]:
+    return [
+        {
+            "id": i,
+            "text": f"Вопрос {i}: как ускорить обработку запросов?",
+            "answer_count": HOT_QUESTION_ANSWERS if i == HOT_QUESTION_ID else i % 3,
+            "created_at": BASE_TIME + timedelta(seconds=i),
+            "updated_at": BASE_TIME + timedelta(seconds=i),
+        }
+        for i in range(start, stop)
+    ]
+
+
+def _answer_rows(question_ids: range) -> List[dict]:
+    rows = []
+    for question_id in question_ids:
+        count = HOT_QUESTION_ANSWERS if question_id == HOT_QUESTION_ID else question_id % 3
+        for n in range(count):
+            created_at = BASE_TIME + timedelta(seconds=question_id, milliseconds=n)
+            rows.append({
+                "question_id": question_id,
+                "user_id": n + 1,
+                "text": f"Ответ {n} на вопрос {question_id}",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+    return rows
+
+
+async def _seed(engine: AsyncEngine, rows: int) -> None:
+    """Создать схему и заполнить rows вопросами и ~rows ответами"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for start in range(1, rows + 1, SEED_CHUNK_SIZE):
+            chunk = range(start, min(start + SEED_CHUNK_SIZE, rows + 1))
+            await conn.execute(insert(Question), _question_rows(chunk.start, chunk.stop))
+            await conn.execute(insert(Answer), _answer_rows(chunk))
+
+
+@pytest.fixture(scope="session")
+def bench_loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def dataset(request, bench_loop):
+    """Набор данных заданного размера (файл SQLite переиспользуется между запусками)"""
+    rows = request.param
+    DATASET_DIR.mkdir(parents=True, exist_ok=True)
+    path = DATASET_DIR / f"questions_{rows}_{schema_hash()}.db"
+    seeded = path.exists()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    enable_sqlite_foreign_keys(engine.sync_engine)
+
+    if not seeded:
+        try:
+            bench_loop.run_until_complete(_seed(engine, rows))
+        except BaseException:
+            bench_loop.run_until_complete(engine.dispose())
+            path.unlink(missing_ok=True)
+            raise
+
+    yield Dataset(rows, engine, make_sessionmaker(engine), bench_loop)
+    bench_loop.run_until_complete(engine.dispose())
+
+
+@pytest.fixture
+def session(dataset):
+    """Сессия набора данных на время одного бенчмарка"""
+    db = dataset.sessionmaker()
+    yield db
+    dataset.run(db.close)
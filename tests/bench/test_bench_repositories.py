@@ -0,0 +1,82 @@
+import itertools
+from datetime import timedelta
+
+from app.core.cache import EntityCache
+from app.domains.answers.repository import AnswerRepository
+from app.domains.questions.repository import QuestionRepository
+from app.domains.questions.schemas import QuestionSort
+from app.utils.config import settings
+from tests.bench.conftest import BASE_TIME, HOT_QUESTION_ID
+
+
+def spread_ids(rows: int, count: int = 1000):
+    """Детерминированный обход ID по всему набору данных"""
+    return itertools.cycle([1 + (i * 7919) % rows for i in range(count)])
+
+
+def test_get_by_id(benchmark, dataset, session):
+    repository = AnswerRepository(session)
+    ids = spread_ids(dataset.rows)
+
+    async def run():
+        session.expunge_all()
+        return await repository.get_by_id(next(ids))
+
+    benchmark(dataset.run, run)
+
+
+def test_get_by_id_cached(benchmark, dataset, session):
+    repository = QuestionRepository(session, EntityCache(maxsize=10000, ttl=3600))
+    ids = spread_ids(dataset.rows, count=100)
+
+    async def run():
+        return await repository.get_by_id(next(ids))
+
+    benchmark(dataset.run, run)
+
+
+def test_get_all_first_page(benchmark, dataset, session):
+    repository = QuestionRepository(session)
+
+    async def run():
+        session.expunge_all()
+        return await repository.get_all(settings.default_page_size + 1)
+
+    benchmark(dataset.run, run)
+
+
+def test_get_all_deep_page(benchmark, dataset, session):
+    repository = QuestionRepository(session)
+    # Ключ из середины набора данных: keyset-пагинация не должна зависеть от глубины
+    middle = dataset.rows // 2
+    after = (BASE_TIME + timedelta(seconds=middle), middle)
+
+    async def run():
+        session.expunge_all()
+        return await repository.get_all(settings.default_page_size + 1, after)
+
+    benchmark(dataset.run, run)
+
+
+def test_get_all_by_answer_count(benchmark, dataset, session):
+    repository = QuestionRepository(session)
+
+    async def run():
+        session.expunge_all()
+        return await repository.get_all(
+            settings.default_page_size + 1, sort=QuestionSort.answer_count
+        )
+
+    benchmark(dataset.run, run)
+
+
+def test_get_by_id_with_answers(benchmark, dataset, session):
+    repository = QuestionRepository(session)
+
+    async def run():
+        session.expunge_all()
+        return await repository.get_by_id_with_answers(
+            HOT_QUESTION_ID, settings.default_page_size + 1
+        )
+
+    benchmark(dataset.run, run)
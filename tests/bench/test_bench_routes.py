@@ -0,0 +1,55 @@
+"""Полный ASGI-цикл через app.main.app и httpx"""
+import itertools
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import entity_cache
+from app.core.database import get_db, get_read_db
+from app.main import app
+from tests.bench.conftest import HOT_QUESTION_ID
+
+
+@pytest.fixture
+def client(dataset):
+    async def override_get_db():
+        async with dataset.sessionmaker() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    entity_cache.clear()
+    test_client = AsyncClient(app=app, base_url="http://test")
+    yield test_client
+    dataset.run(test_client.aclose)
+    app.dependency_overrides.clear()
+    entity_cache.clear()
+
+
+def test_get_questions(benchmark, dataset, client):
+    async def run():
+        response = await client.get("/api/v1/questions/")
+        assert response.status_code == 200
+        return response
+
+    benchmark(dataset.run, run)
+
+
+def test_get_question(benchmark, dataset, client):
+    async def run():
+        response = await client.get(f"/api/v1/questions/{HOT_QUESTION_ID}")
+        assert response.status_code == 200
+        return response
+
+    benchmark(dataset.run, run)
+
+
+def test_get_answer(benchmark, dataset, client):
+    ids = itertools.cycle([1 + (i * 7919) % dataset.rows for i in range(1000)])
+
+    async def run():
+        response = await client.get(f"/api/v1/answers/{next(ids)}")
+        assert response.status_code == 200
+        return response
+
+    benchmark(dataset.run, run)
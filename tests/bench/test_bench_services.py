@@ -0,0 +1,37 @@
+"""Преобразования ORM -> схемы, которые выполняют сервисы (без обращения к БД)"""
+from app.core.serialization import envelope, validate_many
+from app.domains.questions.repository import QuestionRepository
+from app.domains.questions.schemas import QuestionResponseSchema
+from app.domains.questions.service import QuestionService
+from app.utils.config import settings
+from tests.bench.conftest import HOT_QUESTION_ID
+
+
+def test_validate_question_page(benchmark, dataset, session):
+    questions = dataset.run(
+        lambda: QuestionRepository(session).get_all(settings.default_page_size)
+    )
+
+    benchmark(validate_many, QuestionResponseSchema, questions)
+
+
+def test_validate_question_with_answers(benchmark, dataset, session):
+    question, answers, total = dataset.run(
+        lambda: QuestionRepository(session).get_by_id_with_answers(
+            HOT_QUESTION_ID, settings.default_page_size
+        )
+    )
+
+    benchmark(QuestionService._with_answers, question, answers, total)
+
+
+def test_render_question_page(benchmark, dataset, session):
+    questions = dataset.run(
+        lambda: QuestionRepository(session).get_all(settings.default_page_size)
+    )
+
+    def render():
+        data = validate_many(QuestionResponseSchema, questions)
+        return envelope("Questions retrieved successfully", data, next_cursor=None).body
+
+    benchmark(render)
@@ -7,7 +7,16 @@ from sqlalchemy.ext.asyncio import (
 from sqlalchemy import text
 from httpx import AsyncClient
 
-from app.core.database import Base, get_db
+from app.core.cache import entity_cache
+from app.core.compression import compressed_cache
+from app.core.single_flight import question_reads
+from app.core.database import (
+    Base,
+    enable_sqlite_foreign_keys,
+    get_db,
+    get_read_db,
+    get_session_factory
+)
 from app.main import app
 # Импортируем модели для создания таблиц в тестах
 from app.domains.questions.model import Question  # noqa
@@ -22,6 +31,11 @@ engine = create_async_engine(
     future=True,
     connect_args={"check_same_thread": False}  # Для SQLite
 )
+
+
+enable_sqlite_foreign_keys(engine.sync_engine)
+
+
 TestingSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -59,6 +73,12 @@ async def client(db_session):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    # БД пересоздается для каждого теста - кэш сущностей тоже
+    entity_cache.clear()
+    compressed_cache.clear()
+    question_reads.clear()
 
     async with AsyncClient(app=app, base_url="http://test") as test_client:
         yield test_client
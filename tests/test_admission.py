@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, status
+from httpx import AsyncClient
+
+from app.core.admission import AdmissionController, ClientRateLimiter, concurrency_limit
+from app.core.middleware import AdmissionMiddleware
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_queue_and_shedding():
+    """Сверх лимита запросы ждут в очереди, при переполнении очереди - отказ"""
+    controller = AdmissionController(limit=1, queue_size=1, queue_timeout=5.0)
+
+    assert await controller.acquire() is None
+    waiting = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+    assert await controller.acquire() == "queue_full"
+
+    # Освобожденный слот передается ожидающему
+    controller.release()
+    assert await waiting is None
+    assert controller.active == 1
+    controller.release()
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_admission_controller_queue_timeout():
+    """Запрос, не дождавшийся слота, получает отказ и покидает очередь"""
+    controller = AdmissionController(limit=1, queue_size=10, queue_timeout=0.01)
+
+    assert await controller.acquire() is None
+    assert await controller.acquire() == "queue_timeout"
+    assert controller.queued == 0
+    controller.release()
+    assert controller.active == 0
+
+
+def test_client_rate_limiter(monkeypatch):
+    """Клиент получает burst запросов сразу, дальше - rate в секунду"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.admission.time.monotonic", lambda: now[0])
+    limiter = ClientRateLimiter(rate=2.0, burst=2, max_clients=1)
+
+    assert limiter.check("a") == 0
+    assert limiter.check("a") == 0
+    assert limiter.check("a") == pytest.approx(0.5)
+    now[0] += 0.5
+    assert limiter.check("a") == 0
+
+    # Другой клиент вытесняет ведро первого (max_clients=1)
+    assert limiter.check("b") == 0
+    assert limiter.check("a") == 0
+
+
+
+def test_concurrency_limit_from_effective_pools(monkeypatch):
+    """Лимит по умолчанию - сумма пулов primary и реплик, в режиме PgBouncer - только явный"""
+    from app.utils.config import settings
+
+    monkeypatch.setattr(settings, "admission_concurrency_limit", 0)
+    monkeypatch.setattr(settings, "db_pool_size", 5)
+    monkeypatch.setattr(settings, "db_max_overflow", 10)
+    monkeypatch.setattr(settings, "database_replica_urls", ["postgresql://replica/db"])
+    assert concurrency_limit() == 30
+
+    monkeypatch.setattr(settings, "db_pgbouncer_mode", True)
+    with pytest.raises(ValueError):
+        concurrency_limit()
+
+    monkeypatch.setattr(settings, "admission_concurrency_limit", 40)
+    assert concurrency_limit() == 40
+
+
+def make_app(controller, rate_limiter=None):
+    """Приложение с одним медленным endpoint и контролем допуска"""
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=controller,
+        rate_limiter=rate_limiter,
+        exempt_paths=["/health"]
+    )
+    return app, release
+
+
+@pytest.mark.asyncio
+async def test_admission_middleware_sheds_with_503():
+    """При переполнении очереди запрос сразу получает 503 в StandardResponse"""
+    app, release = make_app(AdmissionController(limit=1, queue_size=0, queue_timeout=1.0))
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        slow = asyncio.create_task(client.get("/slow"))
+        await asyncio.sleep(0.05)
+
+        response = await client.get("/slow")
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+        assert response.json() == {"message": "Service is overloaded, try again later", "data": None}
+
+        # /health не ограничивается
+        response = await client.get("/health")
+        assert response.status_code == status.HTTP_200_OK
+
+        release.set()
+        assert (await slow).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_admission_middleware_rate_limits_with_429():
+    """Клиент, превысивший частоту, получает 429 с Retry-After"""
+    controller = AdmissionController(limit=10, queue_size=10, queue_timeout=1.0)
+    app, _ = make_app(controller, ClientRateLimiter(rate=0.1, burst=1, max_clients=10))
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        assert (await client.get("/health")).status_code == status.HTTP_200_OK
+        response = await client.get("/missing")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+        response = await client.get("/missing")
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["retry-after"] == "10"
+        assert response.json()["message"] == "Too many requests"
+    assert controller.active == 0
@@ -418,3 +418,256 @@ async def test_get_question_with_multiple_answers(client):
 
     assert len(question["answers"]) == 3
     assert all(answer["question_id"] == question_id for answer in question["answers"])
+
+
+@pytest.mark.asyncio
+async def test_get_answer_conditional_get(client):
+    """Тест ETag и ответа 304 для ответа"""
+    question_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["data"]["id"]
+    answer_response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+    answer_id = answer_response.json()["data"]["id"]
+
+    # Без сжатия ETag сильный
+    identity = {"Accept-Encoding": "identity"}
+    response = await client.get(f"/api/v1/answers/{answer_id}", headers=identity)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        f"/api/v1/answers/{answer_id}",
+        headers={**identity, "If-None-Match": f"W/{etag}, \"other\""}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+
+
+@pytest.mark.asyncio
+async def test_create_answers_batch(client):
+    """Тест пакетного создания ответов к вопросу"""
+    question_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["data"]["id"]
+
+    response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/batch",
+        json=[
+            {"text": "Ответ 1", "user_id": 1},
+            {"text": "Ответ 2", "user_id": 0},
+            {"text": "Ответ 3", "user_id": 3}
+        ]
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    result = response.json()["data"]
+    assert [a["text"] for a in result["created"]] == ["Ответ 1", "Ответ 3"]
+    assert all(a["question_id"] == question_id for a in result["created"])
+    assert [e["index"] for e in result["errors"]] == [1]
+    assert "user_id" in result["errors"][0]["message"]
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.json()["data"]["answers_total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_answers_batch_nonexistent_question(client):
+    """Тест пакетного создания ответов к несуществующему вопросу"""
+    response = await client.post(
+        "/api/v1/questions/999/answers/batch",
+        json=[{"text": "Ответ", "user_id": 1}]
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "does not exist" in response.json()["message"]
+
+
+@pytest.mark.asyncio
+async def test_create_answers_batch_nonexistent_question_all_invalid(client):
+    """Пачка только из невалидных ответов к несуществующему вопросу - 404, а не 201"""
+    response = await client.post(
+        "/api/v1/questions/999/answers/batch",
+        json=[{"text": "", "user_id": 1}, {"text": "Ответ"}]
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert "does not exist" in response.json()["message"]
+
+
+@pytest.mark.asyncio
+async def test_answer_count_maintained_on_write(client):
+    """Тест поддержки answer_count при создании и удалении ответов"""
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question = create_response.json()["data"]
+    assert question["answer_count"] == 0
+    question_id = question["id"]
+
+    single = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+    assert single.status_code == status.HTTP_201_CREATED
+    batch = await client.post(
+        f"/api/v1/questions/{question_id}/answers/batch",
+        json=[{"text": f"Ответ {i}", "user_id": 2} for i in range(3)]
+    )
+    assert batch.status_code == status.HTTP_201_CREATED
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    data = response.json()["data"]
+    assert data["answer_count"] == 4
+    assert data["answers_total"] == 4
+
+    answer_id = single.json()["data"]["id"]
+    delete_response = await client.delete(f"/api/v1/answers/{answer_id}")
+    assert delete_response.status_code == status.HTTP_200_OK
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    data = response.json()["data"]
+    assert data["answer_count"] == 3
+    assert len(data["answers"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_recompute_answer_counts(client, db_session):
+    """Тест пересчета рассогласованного answer_count"""
+    from sqlalchemy import update
+    from app.domains.questions.model import Question
+    from app.domains.questions.repository import QuestionRepository
+
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+    await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+
+    await db_session.execute(
+        update(Question).where(Question.id == question_id).values(answer_count=42)
+    )
+    await db_session.commit()
+
+    repository = QuestionRepository(db_session)
+    assert await repository.recompute_answer_counts() == 1
+    assert await repository.recompute_answer_counts() == 0
+
+    question = await repository.get_by_id(question_id)
+    assert question.answer_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_user_answers_pagination(client, db_session):
+    """Тест постраничного получения ответов пользователя"""
+    from datetime import datetime
+    from app.domains.answers.model import Answer
+
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+
+    # Явно задаем created_at (см. test_get_questions_pagination)
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    db_session.add_all([
+        Answer(
+            question_id=question_id,
+            user_id=7 if i % 2 else 8,
+            text=f"Ответ {i}",
+            created_at=created_at,
+            updated_at=created_at
+        )
+        for i in range(10)
+    ])
+    await db_session.commit()
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        response = await client.get("/api/v1/users/7/answers", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert all(answer["user_id"] == 7 for answer in response_data["data"])
+        seen.extend(answer["id"] for answer in response_data["data"])
+        cursor = response_data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_get_user_answers_pages_to_end(client):
+    """Ответы пользователя, созданные через API, проходятся до конца без повторов"""
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+    answer_ids = []
+    for i in range(5):
+        response = await client.post(
+            f"/api/v1/questions/{question_id}/answers/",
+            json={"text": f"Ответ {i}", "user_id": 7}
+        )
+        answer_ids.append(response.json()["data"]["id"])
+
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = await client.get("/api/v1/users/7/answers", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        seen.extend(answer["id"] for answer in response_data["data"])
+        assert len(seen) == len(set(seen)), "курсор вернул уже полученные ответы"
+        if response_data["next_cursor"] is None:
+            break
+        params["cursor"] = response_data["next_cursor"]
+
+    assert seen == answer_ids[::-1]
+
+
+@pytest.mark.asyncio
+async def test_get_user_answers_uses_index(db_session):
+    """Тест плана запроса ответов пользователя: диапазонное сканирование индекса"""
+    from sqlalchemy import text
+
+    plan = await db_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT * FROM answers WHERE user_id = 7 "
+        "ORDER BY created_at DESC, id DESC LIMIT 21"
+    ))
+    details = " ".join(row[-1] for row in plan)
+    assert "ix_answers_user_id_created_at_id" in details
+    assert "TEMP B-TREE" not in details
+
+
+@pytest.mark.asyncio
+async def test_get_user_answers_invalid_user_id(client):
+    """Тест получения ответов пользователя с некорректным ID"""
+    response = await client.get("/api/v1/users/0/answers")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_answers_of_marked_deleted_question_hidden(client, db_session):
+    """Ответы вопроса, отмеченного на удаление, не видны до его очистки"""
+    from app.core.cache import entity_cache
+    from app.domains.questions.repository import QuestionRepository
+
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+    answer_response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 9}
+    )
+    answer_id = answer_response.json()["data"]["id"]
+    # Ответ попадает в кэш сущностей
+    response = await client.get(f"/api/v1/answers/{answer_id}")
+    assert response.status_code == status.HTTP_200_OK
+
+    assert await QuestionRepository(db_session, entity_cache).mark_deleted(question_id) is True
+
+    response = await client.get(f"/api/v1/answers/{answer_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.get("/api/v1/users/9/answers")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
+    response = await client.delete(f"/api/v1/answers/{answer_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
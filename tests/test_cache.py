@@ -0,0 +1,112 @@
+import pytest
+from fastapi import status
+
+from app.core.cache import EntityCache, entity_cache
+
+
+def test_entity_cache_lru_eviction():
+    """Тест вытеснения самой давно использованной записи"""
+    cache = EntityCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["size"] == 2
+
+
+def test_entity_cache_ttl_expiration(monkeypatch):
+    """Тест устаревания записи по TTL"""
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = EntityCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    now[0] += 5
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0, "maxsize": 10}
+
+
+
+def test_entity_cache_rejects_load_started_before_invalidation(monkeypatch):
+    """Загрузка, начатая до сброса, не возвращает в кэш старую версию строки"""
+    now = [100.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    cache = EntityCache(maxsize=10, ttl=60)
+
+    loaded_at = now[0]
+    now[0] += 1
+    cache.invalidate("a", version=2.0)
+    now[0] += 1
+
+    assert cache.set("a", "old", loaded_at=loaded_at, version=1.0) is False
+    assert cache.get("a") is None
+    assert cache.set("a", "new", loaded_at=loaded_at, version=2.0) is True
+    assert cache.get("a") == "new"
+
+    # Строка удалена: до сброса ее могла прочитать только устаревшая загрузка
+    cache.invalidate("b")
+    assert cache.set("b", "deleted", loaded_at=loaded_at, version=1.0) is False
+    assert cache.set("b", "recreated", loaded_at=now[0] + 1, version=3.0) is True
+
+    # Полная очистка отклоняет все загрузки, начатые до нее
+    cache.clear()
+    assert cache.set("c", "old", loaded_at=loaded_at, version=5.0) is False
+
+
+def test_entity_cache_keeps_newer_version_on_late_invalidation():
+    """Запоздавший сброс не удаляет уже загруженную новую версию"""
+    cache = EntityCache(maxsize=10, ttl=60)
+    cache.set("a", "new", version=2.0)
+
+    cache.invalidate("a", version=2.0)
+    assert cache.get("a") == "new"
+    assert cache.set("a", "old", version=1.0) is False
+    cache.invalidate("a", version=3.0)
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_get_answer_served_from_cache(client):
+    """Тест чтения ответа из кэша и инвалидации при удалении"""
+    question_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["data"]["id"]
+    answer_response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+    answer = answer_response.json()["data"]
+
+    for _ in range(2):
+        response = await client.get(f"/api/v1/answers/{answer['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == answer
+    # Ответ попал в кэш при создании - в БД за ним не ходили
+    assert entity_cache.stats()["misses"] == 0
+    assert entity_cache.stats()["hits"] > 0
+
+    await client.delete(f"/api/v1/answers/{answer['id']}")
+    response = await client.get(f"/api/v1/answers/{answer['id']}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_question_delete_invalidates_cached_answers(client):
+    """Тест инвалидации кэшированных ответов при каскадном удалении вопроса"""
+    question_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = question_response.json()["data"]["id"]
+    answer_response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+    answer_id = answer_response.json()["data"]["id"]
+    await client.get(f"/api/v1/answers/{answer_id}")
+
+    await client.delete(f"/api/v1/questions/{question_id}")
+
+    response = await client.get(f"/api/v1/answers/{answer_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,129 @@
+import pytest
+from fastapi import status
+
+from app.core.compression import compressed_cache, negotiate_encoding
+
+
+async def create_large_question(client) -> int:
+    """Вопрос с длинными ответами - тело ответа заведомо больше порога сжатия"""
+    response = await client.post("/api/v1/questions/", json={"text": "Большой вопрос"})
+    question_id = response.json()["data"]["id"]
+    await client.post(
+        f"/api/v1/questions/{question_id}/answers/batch",
+        json=[{"text": "Длинный ответ. " * 500, "user_id": 1}] * 5
+    )
+    return question_id
+
+
+def test_negotiate_encoding():
+    """Тест выбора кодировки по Accept-Encoding"""
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, deflate") == "deflate"
+    assert negotiate_encoding("gzip;q=0, *;q=0.1") == "deflate"
+    assert negotiate_encoding("gzip;q=0, deflate;q=0") is None
+
+
+@pytest.mark.asyncio
+async def test_large_response_compressed(client):
+    """Тест сжатия большого ответа gzip и deflate"""
+    question_id = await create_large_question(client)
+
+    plain = await client.get(
+        f"/api/v1/questions/{question_id}", headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+
+    for encoding in ("gzip", "deflate"):
+        response = await client.get(
+            f"/api/v1/questions/{question_id}", headers={"Accept-Encoding": encoding}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+        # httpx распаковывает тело сам
+        assert response.content == plain.content
+        assert int(response.headers["content-length"]) < len(plain.content)
+
+
+@pytest.mark.asyncio
+async def test_small_response_not_compressed(client):
+    """Тест ответа меньше порога: отдается без сжатия"""
+    response = await client.get("/api/v1/questions/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == status.HTTP_200_OK
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_compressed_body_cached_by_version(client):
+    """Тест повторного использования сжатого тела для той же версии ресурса"""
+    question_id = await create_large_question(client)
+    url = f"/api/v1/questions/{question_id}"
+    headers = {"Accept-Encoding": "gzip"}
+
+    first = await client.get(url, headers=headers)
+    second = await client.get(url, headers=headers)
+    assert first.content == second.content
+    assert compressed_cache.stats()["hits"] == 1
+
+    # Новый ответ меняет версию вопроса - сжимаем заново
+    await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Еще ответ", "user_id": 2}
+    )
+    third = await client.get(url, headers=headers)
+    assert third.json()["data"]["answer_count"] == 6
+    assert compressed_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_with_weak_etag(client):
+    """Тест условного GET со слабым ETag сжатого представления"""
+    question_id = await create_large_question(client)
+    url = f"/api/v1/questions/{question_id}"
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    cached = await client.get(
+        url, headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]}
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert "Accept-Encoding" in cached.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_not_modified_matches_uncompressed_small_response(client):
+    """Ответ 304 несет те же ETag и Vary, что и несжатый ответ 200 меньше порога"""
+    headers = {"Accept-Encoding": "gzip"}
+    response = await client.get("/api/v1/questions/", headers=headers)
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"].startswith("W/")
+
+    cached = await client.get(
+        "/api/v1/questions/", headers={**headers, "If-None-Match": response.headers["etag"]}
+    )
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["etag"] == response.headers["etag"]
+    assert cached.headers["vary"] == response.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_export_compressed(client):
+    """Тест потокового сжатия экспорта"""
+    await create_large_question(client)
+
+    plain = await client.get(
+        "/api/v1/questions/export",
+        params={"include_answers": True},
+        headers={"Accept-Encoding": "identity"}
+    )
+    response = await client.get(
+        "/api/v1/questions/export",
+        params={"include_answers": True},
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == plain.content
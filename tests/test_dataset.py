@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+from app.utils.dataset import (
+    ANSWER_MAX_LENGTH,
+    QUESTION_MAX_LENGTH,
+    DatasetGenerator,
+    DatasetSpec,
+    load_dataset
+)
+from tests.conftest import engine
+
+SPEC = DatasetSpec(questions=50, answers=400, seed=7, answer_length_median=2000)
+
+
+def test_generator_is_deterministic():
+    """Тест детерминированности генератора по seed"""
+    first, second = DatasetGenerator(SPEC), DatasetGenerator(SPEC)
+    assert list(first.question_rows()) == list(second.question_rows())
+    assert list(first.answer_rows()) == list(second.answer_rows())
+
+    other = DatasetGenerator(DatasetSpec(questions=50, answers=400, seed=8))
+    assert list(other.answer_rows()) != list(first.answer_rows())
+
+
+def test_generator_respects_schema_limits():
+    """Тест ограничений длины текста и согласованности answer_count"""
+    generator = DatasetGenerator(SPEC)
+    questions = list(generator.question_rows())
+    answers = list(generator.answer_rows())
+
+    assert len(questions) == SPEC.questions
+    assert len(answers) == SPEC.answers
+    assert all(1 <= len(row[1]) <= QUESTION_MAX_LENGTH for row in questions)
+    assert all(1 <= len(row[2]) <= ANSWER_MAX_LENGTH for row in answers)
+    assert sum(row[2] for row in questions) == SPEC.answers
+    # Перекос: самый популярный вопрос собирает заметно больше среднего
+    assert max(row[2] for row in questions) > 2 * SPEC.answers / SPEC.questions
+
+
+@pytest.mark.asyncio
+async def test_load_dataset(db_session):
+    """Тест загрузки набора данных в SQLite с продолжением ID"""
+    db_session.add(Question(text="Существующий вопрос"))
+    await db_session.commit()
+
+    stats = await load_dataset(engine, SPEC, chunk_size=64)
+    assert [(item.table, item.rows) for item in stats] == [
+        ("questions", SPEC.questions),
+        ("answers", SPEC.answers),
+    ]
+
+    assert await db_session.scalar(select(func.count(Question.id))) == SPEC.questions + 1
+    assert await db_session.scalar(select(func.count(Answer.id))) == SPEC.answers
+    mismatched = await db_session.scalar(
+        select(func.count(Question.id)).filter(
+            Question.answer_count != select(func.count(Answer.id))
+            .filter(Answer.question_id == Question.id)
+            .scalar_subquery()
+        )
+    )
+    assert mismatched == 0
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.cache import EntityCache
+from app.core.invalidation import InvalidationBus, InvalidationTransport, UnixSocketTransport
+from app.domains.questions.model import Question
+from app.domains.questions.repository import QuestionRepository
+
+
+class RecordingTransport(InvalidationTransport):
+    """Транспорт, запоминающий отправленные сообщения"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def start(self, on_message):
+        pass
+
+    def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    async def close(self):
+        pass
+
+
+def make_cache():
+    cache = EntityCache(maxsize=100, ttl=60.0)
+    cache.set(("questions", 1), {"id": 1})
+    cache.set(("questions", 2), {"id": 2})
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_bus_invalidates_other_workers(tmp_path):
+    """Сброс ключа в одном воркере сбрасывает его в кэшах остальных"""
+    caches = [make_cache() for _ in range(3)]
+    buses = [
+        InvalidationBus(UnixSocketTransport(str(tmp_path), name=f"worker{i}"), [cache])
+        for i, cache in enumerate(caches)
+    ]
+    for bus in buses:
+        await bus.start()
+    try:
+        buses[0].publish([("questions", 1, None)])
+        for _ in range(100):
+            if all(cache.get(("questions", 1)) is None for cache in caches[1:]):
+                break
+            await asyncio.sleep(0.01)
+
+        assert caches[0].get(("questions", 1)) == {"id": 1}
+        for cache in caches[1:]:
+            assert cache.get(("questions", 1)) is None
+            assert cache.get(("questions", 2)) == {"id": 2}
+    finally:
+        for bus in buses:
+            await bus.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_bus_skips_own_and_malformed_messages():
+    """Свои сообщения (NOTIFY приходит и отправителю) и мусор не применяются"""
+    cache = make_cache()
+    bus = InvalidationBus(RecordingTransport(), [cache])
+    bus.publish([("questions", 1, None)])
+    own = json.dumps(bus.transport.sent[0]).encode()
+
+    bus._receive(own)
+    bus._receive(b"not json")
+    assert cache.get(("questions", 1)) == {"id": 1}
+
+    other = InvalidationBus(RecordingTransport(), [])
+    other.publish([("questions", 1, None), ("questions", 2, None)])
+    bus._receive(json.dumps(other.transport.sent[0]).encode())
+    assert cache.get(("questions", 1)) is None
+    assert cache.get(("questions", 2)) is None
+
+
+@pytest.mark.asyncio
+async def test_repository_publishes_invalidations(db_session, monkeypatch):
+    """Репозиторий публикует ключи, сброшенные после commit"""
+    bus = InvalidationBus(RecordingTransport(), [])
+    monkeypatch.setattr("app.core.invalidation.invalidation_bus", bus)
+
+    question = Question(text="Вопрос")
+    db_session.add(question)
+    await db_session.commit()
+
+    repository = QuestionRepository(db_session, EntityCache(maxsize=100, ttl=60.0))
+    assert await repository.delete(question.id)
+
+    assert [message["keys"] for message in bus.transport.sent] == [[["questions", question.id, None]]]
+
+
+@pytest.mark.asyncio
+async def test_answer_insert_publishes_question_version(db_session, monkeypatch):
+    """Изменение счетчика ответов публикует ключ вопроса с его новой версией"""
+    from app.core.base_repository import entity_version
+    from app.domains.answers.repository import AnswerRepository
+    from app.domains.answers.schemas import AnswerCreateSchema
+
+    bus = InvalidationBus(RecordingTransport(), [])
+    monkeypatch.setattr("app.core.invalidation.invalidation_bus", bus)
+
+    question = Question(text="Вопрос")
+    db_session.add(question)
+    await db_session.commit()
+    cache = EntityCache(maxsize=100, ttl=60.0)
+
+    await AnswerRepository(db_session, cache).create(
+        question.id, AnswerCreateSchema(text="Ответ", user_id=1)
+    )
+
+    [[table, entity_id, version]] = bus.transport.sent[0]["keys"]
+    assert (table, entity_id) == ("questions", question.id)
+    await db_session.refresh(question)
+    assert version == entity_version(question.updated_at)
+
+
+@pytest.mark.asyncio
+async def test_recompute_answer_counts_broadcasts_clear(db_session, monkeypatch):
+    """Пересчет счетчиков сбрасывает кэш целиком во всех воркерах"""
+    bus = InvalidationBus(RecordingTransport(), [])
+    monkeypatch.setattr("app.core.invalidation.invalidation_bus", bus)
+
+    question = Question(text="Вопрос", answer_count=3)
+    db_session.add(question)
+    await db_session.commit()
+
+    repository = QuestionRepository(db_session, EntityCache(maxsize=100, ttl=60.0))
+    assert await repository.recompute_answer_counts() == 1
+
+    [message] = bus.transport.sent
+    assert message["clear"] is True
+
+    cache = make_cache()
+    receiver = InvalidationBus(RecordingTransport(), [cache])
+    receiver._receive(json.dumps(message).encode())
+    assert cache.stats()["size"] == 0
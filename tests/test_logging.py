@@ -0,0 +1,23 @@
+import logging
+import queue
+
+from app.utils.logger import _ThreadQueueHandler
+
+
+def test_queue_handler_formats_arguments_on_emitting_thread():
+    """Аргументы подставляются при вызове логгера, а не в потоке записи"""
+    log_queue = queue.SimpleQueue()
+    handler = _ThreadQueueHandler(log_queue)
+    logger = logging.getLogger("tests.queue_handler")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        value = {"state": "before"}
+        logger.warning("value %s", value)
+        value["state"] = "after"
+    finally:
+        logger.removeHandler(handler)
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "value {'state': 'before'}"
+    assert record.args is None
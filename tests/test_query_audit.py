@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import func, select, text
+
+from app.core.query_audit import audit_queries
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+from tests.conftest import engine
+
+
+async def seed(db_session, questions: int = 3, answers_per_question: int = 2) -> None:
+    for i in range(questions):
+        question = Question(text=f"Вопрос {i}", answer_count=answers_per_question)
+        question.answers = [
+            Answer(user_id=n + 1, text=f"Ответ {n}") for n in range(answers_per_question)
+        ]
+        db_session.add(question)
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_audit_finds_only_expected_scans(db_session):
+    """Тест аудита: неожиданных последовательных сканирований нет"""
+    await seed(db_session)
+
+    findings = await audit_queries(engine, row_threshold=0)
+
+    assert findings
+    assert [finding for finding in findings if not finding.expected] == []
+
+
+@pytest.mark.asyncio
+async def test_audit_flags_missing_index(db_session):
+    """Тест аудита: без индекса по answers.question_id ответы вопроса читаются сканированием"""
+    await seed(db_session)
+    await db_session.execute(text("DROP INDEX ix_answers_question_id_created_at_id"))
+    await db_session.commit()
+
+    findings = await audit_queries(engine, row_threshold=0)
+
+    flagged = {finding.operation for finding in findings if not finding.expected}
+    assert "QuestionRepository.get_by_id_with_answers" in flagged
+    assert all(finding.table == "answers" for finding in findings if not finding.expected)
+
+
+@pytest.mark.asyncio
+async def test_audit_rolls_back_workload(db_session):
+    """Тест аудита: нагрузка не оставляет изменений в БД"""
+    await seed(db_session)
+
+    await audit_queries(engine, row_threshold=0)
+
+    assert await db_session.scalar(select(func.count(Question.id))) == 3
+    assert await db_session.scalar(select(func.count(Answer.id))) == 6
@@ -83,6 +83,7 @@ async def test_get_all_questions_empty(client):
     assert "data" in response_data
     assert response_data["message"] == "Questions retrieved successfully"
     assert response_data["data"] == []
+    assert response_data["next_cursor"] is None
 
 
 @pytest.mark.asyncio
@@ -117,6 +118,108 @@ async def test_get_all_questions_with_data(client):
     assert question2_text in texts
 
 
+async def collect_pages(client, url, limit):
+    """Пройти все страницы списка по курсору; повтор строк - ошибка теста"""
+    seen = []
+    pages = 0
+    params = {"limit": limit}
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        seen.extend(item["id"] for item in body["data"])
+        pages += 1
+        assert len(seen) == len(set(seen)), "курсор вернул уже полученные строки"
+        if body["next_cursor"] is None:
+            return seen, pages
+        params["cursor"] = body["next_cursor"]
+
+
+@pytest.mark.asyncio
+async def test_get_questions_pagination(client):
+    """Тест постраничного получения вопросов, созданных через API, до конца"""
+    for i in range(5):
+        await client.post("/api/v1/questions/", json={"text": f"Вопрос {i}"})
+
+    seen, pages = await collect_pages(client, "/api/v1/questions/", 2)
+
+    # Все вопросы получены ровно один раз, от новых к старым
+    assert pages == 3
+    assert seen == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_questions_pagination_same_created_at(client, db_session):
+    """Строки с одинаковым created_at упорядочиваются по id и не теряются"""
+    from datetime import datetime
+    from app.domains.questions.model import Question
+
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    db_session.add_all([
+        Question(text=f"Вопрос {i}", created_at=created_at, updated_at=created_at)
+        for i in range(5)
+    ])
+    await db_session.commit()
+
+    seen, _ = await collect_pages(client, "/api/v1/questions/", 2)
+    assert seen == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_get_questions_sorted_by_answer_count(client):
+    """Тест постраничного получения вопросов по убыванию числа ответов"""
+    answer_counts = [2, 0, 3, 2]
+    question_ids = []
+    for i, count in enumerate(answer_counts):
+        response = await client.post("/api/v1/questions/", json={"text": f"Вопрос {i}"})
+        question_id = response.json()["data"]["id"]
+        question_ids.append(question_id)
+        if count:
+            await client.post(
+                f"/api/v1/questions/{question_id}/answers/batch",
+                json=[{"text": "Ответ", "user_id": 1}] * count
+            )
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"limit": 3, "sort": "answer_count"}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = await client.get("/api/v1/questions/", params=params)
+        assert page.status_code == status.HTTP_200_OK
+        page_data = page.json()
+        seen.extend((q["answer_count"], q["id"]) for q in page_data["data"])
+        cursor = page_data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [
+        (3, question_ids[2]),
+        (2, question_ids[3]),
+        (2, question_ids[0]),
+        (0, question_ids[1]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_questions_invalid_cursor(client):
+    """Тест получения вопросов с поврежденным курсором"""
+    response = await client.get("/api/v1/questions/", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response_data = response.json()
+    assert response_data["data"] is None
+    assert "cursor" in response_data["message"]
+
+
+@pytest.mark.asyncio
+async def test_get_questions_limit_too_large(client):
+    """Тест получения вопросов с превышением максимального размера страницы"""
+    response = await client.get("/api/v1/questions/", params={"limit": 100000})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 @pytest.mark.asyncio
 async def test_get_question_by_id_success(client):
     """Тест успешного получения вопроса по ID"""
@@ -176,11 +279,110 @@ async def test_get_question_by_id_with_answers(client):
     question = response.json()["data"]
 
     assert len(question["answers"]) == 2
+    assert question["answers_total"] == 2
+    assert question["answers_next_cursor"] is None
     assert all("id" in answer for answer in question["answers"])
     assert all("text" in answer for answer in question["answers"])
     assert all("user_id" in answer for answer in question["answers"])
 
 
+@pytest.mark.asyncio
+async def test_get_question_answers_window(client, db_session):
+    """Тест постраничного получения ответов внутри вопроса"""
+    from datetime import datetime
+    from app.core.cache import entity_cache
+    from app.domains.answers.model import Answer
+    from app.domains.questions.repository import QuestionRepository
+
+    create_response = await client.post(
+        "/api/v1/questions/",
+        json={"text": "Популярный вопрос"}
+    )
+    question_id = create_response.json()["data"]["id"]
+
+    # Явно задаем одинаковый created_at (см. test_get_questions_pagination)
+    created_at = datetime(2025, 1, 1, 12, 0, 0)
+    db_session.add_all([
+        Answer(
+            question_id=question_id,
+            user_id=i + 1,
+            text=f"Ответ {i}",
+            created_at=created_at,
+            updated_at=created_at
+        )
+        for i in range(5)
+    ])
+    await db_session.commit()
+    # Ответы добавлены в обход AnswerRepository - пересчитываем answer_count
+    await QuestionRepository(db_session, entity_cache).recompute_answer_counts()
+
+    response = await client.get(
+        f"/api/v1/questions/{question_id}",
+        params={"answers_limit": 3}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    question = response.json()["data"]
+    assert question["answers_total"] == 5
+    assert len(question["answers"]) == 3
+    assert question["answers_next_cursor"] is not None
+
+    response = await client.get(
+        f"/api/v1/questions/{question_id}",
+        params={"answers_limit": 3, "answers_cursor": question["answers_next_cursor"]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    rest = response.json()["data"]
+    assert len(rest["answers"]) == 2
+    assert rest["answers_next_cursor"] is None
+
+    # Ответы идут от старых к новым без повторов
+    ids = [a["id"] for a in question["answers"] + rest["answers"]]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_question_walks_all_answer_windows(client):
+    """Все окна ответов, созданных через API, проходятся до конца без повторов"""
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос с окнами"})
+    question_id = create_response.json()["data"]["id"]
+    answer_ids = []
+    for i in range(7):
+        response = await client.post(
+            f"/api/v1/questions/{question_id}/answers/",
+            json={"text": f"Ответ {i}", "user_id": i + 1}
+        )
+        answer_ids.append(response.json()["data"]["id"])
+
+    seen = []
+    params = {"answers_limit": 3}
+    while True:
+        response = await client.get(f"/api/v1/questions/{question_id}", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        question = response.json()["data"]
+        assert question["answers"], "окно после курсора пустое"
+        seen.extend(answer["id"] for answer in question["answers"])
+        assert len(seen) == len(set(seen)), "курсор вернул уже полученные ответы"
+        if question["answers_next_cursor"] is None:
+            break
+        params["answers_cursor"] = question["answers_next_cursor"]
+
+    assert seen == answer_ids
+
+
+@pytest.mark.asyncio
+async def test_get_question_invalid_answers_cursor(client):
+    """Тест получения вопроса с поврежденным курсором ответов"""
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+
+    response = await client.get(
+        f"/api/v1/questions/{question_id}",
+        params={"answers_cursor": "broken"}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.asyncio
 async def test_get_nonexistent_question(client):
     """Тест получения несуществующего вопроса"""
@@ -273,6 +475,38 @@ async def test_delete_question_cascade_answers(client, db_session):
     assert answer2 is None, "Ответ 2 должен быть удален"
 
 
+@pytest.mark.asyncio
+async def test_delete_question_cascade_on_app_engine(tmp_path):
+    """Каскадное удаление ответов на движке SQLite, настроенном приложением"""
+    from sqlalchemy import select
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from app.core.database import Base, enable_sqlite_foreign_keys, make_sessionmaker
+    from app.domains.answers.model import Answer
+    from app.domains.questions.model import Question
+    from app.domains.questions.repository import QuestionRepository
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    enable_sqlite_foreign_keys(engine.sync_engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_factory = make_sessionmaker(engine)
+        async with session_factory() as session:
+            session.add(Question(id=1, text="Вопрос"))
+            await session.flush()
+            session.add(Answer(id=1, question_id=1, user_id=1, text="Ответ"))
+            await session.commit()
+
+            assert await QuestionRepository(session).delete(1)
+            await session.commit()
+
+            result = await session.execute(select(Answer).where(Answer.question_id == 1))
+            assert result.scalars().all() == []
+    finally:
+        await engine.dispose()
+
+
 @pytest.mark.asyncio
 async def test_delete_nonexistent_question(client):
     """Тест удаления несуществующего вопроса"""
@@ -295,3 +529,343 @@ async def test_delete_question_invalid_id(client):
     assert "message" in response_data
     assert "data" in response_data
     assert "Validation error" in response_data["message"]
+
+
+@pytest.mark.asyncio
+async def test_export_questions_ndjson_with_answers(client):
+    """Тест потоковой выгрузки вопросов с ответами в NDJSON"""
+    import json
+
+    q1 = (await client.post("/api/v1/questions/", json={"text": "Вопрос 1"})).json()["data"]
+    q2 = (await client.post("/api/v1/questions/", json={"text": "Вопрос 2"})).json()["data"]
+    await client.post(
+        f"/api/v1/questions/{q1['id']}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+
+    response = await client.get(
+        "/api/v1/questions/export",
+        params={"format": "ndjson", "include_answers": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [q1["id"], q2["id"]]
+    assert [a["text"] for a in rows[0]["answers"]] == ["Ответ"]
+    assert rows[1]["answers"] == []
+
+
+@pytest.mark.asyncio
+async def test_export_questions_csv(client):
+    """Тест потоковой выгрузки вопросов в CSV"""
+    import csv
+    import io
+
+    await client.post("/api/v1/questions/", json={"text": "Вопрос, с запятой"})
+
+    response = await client.get("/api/v1/questions/export", params={"format": "csv"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "text", "created_at", "updated_at"]
+    assert len(rows) == 2
+    assert rows[1][1] == "Вопрос, с запятой"
+
+
+
+@pytest.mark.asyncio
+async def test_export_questions_uses_own_session(client):
+    """Выгрузка не использует сессию запроса: она может закрыться до чтения тела"""
+    from app.core.database import get_db
+    from app.main import app
+
+    await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+
+    async def closed_request_session():
+        raise RuntimeError("request session is not available while streaming")
+        yield
+
+    app.dependency_overrides[get_db] = closed_request_session
+    response = await client.get("/api/v1/questions/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.text.splitlines()) == 1
+
+@pytest.mark.asyncio
+async def test_export_questions_invalid_format(client):
+    """Тест выгрузки в неподдерживаемом формате"""
+    response = await client.get("/api/v1/questions/export", params={"format": "xml"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_question_conditional_get(client):
+    """Тест ETag и ответа 304 для вопроса"""
+    create_response = await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    question_id = create_response.json()["data"]["id"]
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        f"/api/v1/questions/{question_id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # Новый ответ меняет представление вопроса
+    await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Ответ", "user_id": 1}
+    )
+    response = await client.get(
+        f"/api/v1/questions/{question_id}",
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+    assert len(response.json()["data"]["answers"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_questions_conditional_get(client):
+    """Тест ETag и ответа 304 для списка вопросов"""
+    await client.post("/api/v1/questions/", json={"text": "Вопрос 1"})
+
+    response = await client.get("/api/v1/questions/")
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/questions/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Другой размер страницы - другое представление
+    response = await client.get(
+        "/api/v1/questions/",
+        params={"limit": 5},
+        headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    await client.post("/api/v1/questions/", json={"text": "Вопрос 2"})
+    response = await client.get("/api/v1/questions/", headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_questions_etag_covers_only_requested_page(client):
+    """ETag списка зависит только от строк запрошенной страницы"""
+    ids = []
+    for i in range(3):
+        response = await client.post("/api/v1/questions/", json={"text": f"Вопрос {i}"})
+        ids.append(response.json()["data"]["id"])
+
+    response = await client.get("/api/v1/questions/", params={"limit": 1})
+    etag = response.headers["etag"]
+
+    # Ответ к вопросу вне первой страницы не меняет ее представление
+    await client.post(f"/api/v1/questions/{ids[0]}/answers/", json={"text": "Ответ", "user_id": 1})
+    response = await client.get(
+        "/api/v1/questions/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == etag
+
+    await client.post(f"/api/v1/questions/{ids[2]}/answers/", json={"text": "Ответ", "user_id": 1})
+    response = await client.get(
+        "/api/v1/questions/", params={"limit": 1}, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"][0]["answer_count"] == 1
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_create_questions_batch(client):
+    """Тест пакетного создания вопросов с ошибками в отдельных элементах"""
+    response = await client.post(
+        "/api/v1/questions/batch",
+        json=[{"text": "Вопрос 1"}, {"text": ""}, {"text": "Вопрос 3"}, {}]
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    result = response.json()["data"]
+    assert [q["text"] for q in result["created"]] == ["Вопрос 1", "Вопрос 3"]
+    assert all("id" in q and "created_at" in q for q in result["created"])
+    assert [e["index"] for e in result["errors"]] == [1, 3]
+    assert "text" in result["errors"][0]["message"]
+
+    response = await client.get("/api/v1/questions/")
+    assert len(response.json()["data"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_create_questions_batch_too_large(client):
+    """Тест пакетного создания вопросов с превышением размера пакета"""
+    from app.utils.config import settings
+
+    response = await client.post(
+        "/api/v1/questions/batch",
+        json=[{"text": "Вопрос"}] * (settings.max_batch_size + 1)
+    )
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(client):
+    """Тест метрик запросов в формате Prometheus"""
+    await client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    await client.get("/api/v1/questions/999")
+
+    response = await client.get("/metrics")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert (
+        'http_requests_total{method="GET",route="/api/v1/questions/{question_id}",status="404"}'
+        in body
+    )
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/questions/"}' in body
+    assert "db_pool_checked_out" in body
+
+
+@pytest.mark.asyncio
+async def test_request_id_header(client):
+    """Тест передачи ID запроса в заголовке ответа"""
+    response = await client.get("/api/v1/questions/", headers={"X-Request-ID": "req-42"})
+    assert response.headers["x-request-id"] == "req-42"
+
+    response = await client.get("/api/v1/questions/")
+    assert response.headers["x-request-id"]
+
+
+@pytest.mark.asyncio
+async def test_search_questions(client):
+    """Тест полнотекстового поиска по вопросам и ответам"""
+    python_q = (await client.post(
+        "/api/v1/questions/", json={"text": "Почему python медленный?"}
+    )).json()["data"]
+    rust_q = (await client.post(
+        "/api/v1/questions/", json={"text": "Как выучить rust?"}
+    )).json()["data"]
+    await client.post("/api/v1/questions/", json={"text": "Что почитать?"})
+    await client.post(
+        f"/api/v1/questions/{rust_q['id']}/answers/",
+        json={"text": "Сначала попробуйте python, потом rust", "user_id": 1}
+    )
+
+    response = await client.get("/api/v1/questions/search", params={"q": "python"})
+    assert response.status_code == status.HTTP_200_OK
+    found = response.json()["data"]
+    assert {q["id"] for q in found} == {python_q["id"], rust_q["id"]}
+    assert all("rank" in q for q in found)
+    assert found == sorted(found, key=lambda q: q["rank"], reverse=True)
+
+    # Удаленный вопрос пропадает из индекса
+    await client.delete(f"/api/v1/questions/{python_q['id']}")
+    response = await client.get("/api/v1/questions/search", params={"q": "python"})
+    assert [q["id"] for q in response.json()["data"]] == [rust_q["id"]]
+
+
+@pytest.mark.asyncio
+async def test_search_questions_pagination(client):
+    """Тест постраничного поиска по курсору"""
+    await client.post(
+        "/api/v1/questions/batch",
+        json=[{"text": f"Вопрос про базы данных {i}"} for i in range(5)]
+    )
+
+    seen = []
+    cursor = None
+    for _ in range(5):
+        params = {"q": "базы данных", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/api/v1/questions/search", params=params)).json()
+        seen.extend(q["id"] for q in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+@pytest.mark.asyncio
+async def test_search_questions_special_characters(client):
+    """Тест поиска с операторами FTS в тексте запроса"""
+    await client.post("/api/v1/questions/", json={"text": "Что такое NEAR и OR?"})
+
+    response = await client.get("/api/v1/questions/search", params={"q": 'OR "NEAR('})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.asyncio
+async def test_delete_large_question_purged_in_background(client, db_session, monkeypatch):
+    """Вопрос с числом ответов больше порога удаляется в фоне порциями"""
+    from sqlalchemy import func, select
+    from app.domains.answers.model import Answer
+    from app.domains.questions.model import Question
+    from app.utils.config import settings
+
+    monkeypatch.setattr(settings, "question_purge_threshold", 2)
+    monkeypatch.setattr(settings, "question_purge_chunk_size", 2)
+
+    create_response = await client.post("/api/v1/questions/", json={"text": "Большой вопрос"})
+    question_id = create_response.json()["data"]["id"]
+    await client.post(
+        f"/api/v1/questions/{question_id}/answers/batch",
+        json=[{"text": f"Ответ {i}", "user_id": i + 1} for i in range(5)]
+    )
+
+    response = await client.delete(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["message"] == "Question deletion scheduled"
+
+    # Фоновая задача выполняется до завершения ответа тестовым клиентом
+    await db_session.commit()
+    answers = await db_session.scalar(
+        select(func.count()).select_from(Answer).filter(Answer.question_id == question_id)
+    )
+    assert answers == 0
+    assert await db_session.get(Question, question_id) is None
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_marked_deleted_question_hidden(client, db_session):
+    """Отмеченный на удаление вопрос не виден и не принимает ответы до очистки"""
+    from app.core.cache import entity_cache
+    from app.domains.questions.repository import QuestionRepository
+
+    create_response = await client.post("/api/v1/questions/", json={"text": "Отмеченный вопрос"})
+    question_id = create_response.json()["data"]["id"]
+    await client.get(f"/api/v1/questions/{question_id}")
+
+    repository = QuestionRepository(db_session, entity_cache)
+    assert await repository.mark_deleted(question_id) is True
+    assert await repository.mark_deleted(question_id) is False
+    assert await repository.get_marked_deleted_ids() == [question_id]
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.get("/api/v1/questions/")
+    assert response.json()["data"] == []
+    response = await client.post(
+        f"/api/v1/questions/{question_id}/answers/",
+        json={"text": "Поздний ответ", "user_id": 1}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.delete(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    assert await repository.purge_deleted(question_id, 10) == 0
+    assert await repository.get_marked_deleted_ids() == []
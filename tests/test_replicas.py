@@ -0,0 +1,120 @@
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.cache import entity_cache
+from app.core.database import (
+    Base,
+    ReplicaRouter,
+    get_db,
+    get_read_db,
+    get_replica_router,
+    make_sessionmaker
+)
+from app.core.middleware import ReadYourWritesMiddleware
+from app.domains.answers.model import Answer
+from app.domains.questions.model import Question
+from app.main import app
+
+
+@pytest_asyncio.fixture
+async def replicated_client(tmp_path):
+    """
+    Клиент с primary и репликой в двух файлах SQLite
+
+    Репликация не настроена: все записи остаются только на primary,
+    как при бесконечной задержке репликации.
+    """
+    engines = [
+        create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        for name in ("primary", "replica")
+    ]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    primary = make_sessionmaker(engines[0])
+    replica = make_sessionmaker(engines[1], replica=True)
+    router = ReplicaRouter(primary, [replica], read_your_writes_window=60.0)
+
+    async def override_get_db():
+        async with primary() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_replica_router] = lambda: router
+    app.dependency_overrides.pop(get_read_db, None)
+    entity_cache.clear()
+
+    # Реплики в настройках не заданы - middleware подключается, как при их наличии
+    asgi_app = ReadYourWritesMiddleware(app, window=60.0)
+    async with AsyncClient(app=asgi_app, base_url="http://test") as test_client:
+        # Фабрики сессий - для подготовки данных в тестах
+        test_client.sessionmakers = {"primary": primary, "replica": replica}
+        yield test_client
+
+    app.dependency_overrides.clear()
+    entity_cache.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(replicated_client):
+    """Тест чтения с реплики: запись на primary там не видна"""
+    response = await replicated_client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    assert response.status_code == status.HTTP_201_CREATED
+    replicated_client.cookies.clear()
+
+    response = await replicated_client.get("/api/v1/questions/")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"] == []
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_window(replicated_client):
+    """Тест чтения своей записи с primary сразу после записи"""
+    response = await replicated_client.post("/api/v1/questions/", json={"text": "Вопрос"})
+    assert response.status_code == status.HTTP_201_CREATED
+    assert "last_write" in response.cookies
+    question_id = response.json()["data"]["id"]
+    entity_cache.clear()
+
+    response = await replicated_client.get(f"/api/v1/questions/{question_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["data"]["text"] == "Вопрос"
+
+
+@pytest.mark.asyncio
+async def test_replica_read_does_not_refill_cache_with_deleted_row(replicated_client):
+    """Чтение с отстающей реплики не возвращает в общий кэш удаленный ответ"""
+    for sessionmaker in replicated_client.sessionmakers.values():
+        async with sessionmaker() as session:
+            session.add(Question(id=1, text="Вопрос"))
+            session.add(Answer(id=1, question_id=1, user_id=1, text="Ответ"))
+            await session.commit()
+
+    # Автор удаляет ответ на primary и получает cookie last_write
+    response = await replicated_client.delete("/api/v1/answers/1")
+    assert response.status_code == status.HTTP_200_OK
+    writer_cookies = dict(replicated_client.cookies)
+
+    # Другой клиент читает с реплики, где ответ еще есть
+    replicated_client.cookies.clear()
+    response = await replicated_client.get("/api/v1/answers/1")
+    assert response.status_code == status.HTTP_200_OK
+
+    # Автор в окне read-your-writes не видит удаленный ответ
+    replicated_client.cookies.update(writer_cookies)
+    response = await replicated_client.get("/api/v1/answers/1")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_router_without_replicas_reads_primary():
+    """Тест маршрутизатора без реплик и окна read-your-writes"""
+    primary, replica = object(), object()
+    assert ReplicaRouter(primary).for_read() is primary
+
+    router = ReplicaRouter(primary, [replica], read_your_writes_window=0.0)
+    assert router.for_read(last_write=0.0) is replica
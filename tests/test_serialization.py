@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.serialization import envelope
+from app.domains.questions.schemas import QuestionResponseSchema
+
+
+def test_envelope_matches_pydantic_json_format():
+    """Ответ сериализуется так же, как JSON-режим Pydantic (время UTC с "Z")"""
+    question = QuestionResponseSchema(
+        id=1,
+        text="Вопрос",
+        created_at=datetime(2026, 1, 2, 3, 4, 5, 6789, tzinfo=timezone.utc),
+        updated_at=datetime(2026, 1, 2, tzinfo=timezone.utc)
+    )
+
+    body = envelope("ok", question).body
+
+    assert body == (
+        '{"message":"ok","data":' + question.model_dump_json() + '}'
+    ).encode()
+    assert b'"created_at":"2026-01-02T03:04:05.006789Z"' in body
+
+
+def test_envelope_rejects_unknown_types():
+    """Неизвестный тип не превращается молча в строку"""
+    with pytest.raises(TypeError):
+        envelope("ok", {"value": object()})
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight
+from app.domains.questions.model import Question
+from app.domains.questions.repository import QuestionRepository
+from app.domains.questions.service import QuestionService
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_one_load():
+    """Одновременные загрузки с одним ключом выполняются один раз"""
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    flight = SingleFlight()
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(10)))
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+
+    # После завершения загрузки без окна раздачи - снова в БД
+    await flight.do("key", load)
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_error_with_joined_requests():
+    """Ошибка загрузки достается всем присоединившимся запросам"""
+    async def load():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database is down")
+
+    flight = SingleFlight()
+    results = await asyncio.gather(
+        *(flight.do("key", load) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_single_flight_reloads_when_leader_cancelled():
+    """Отмена запроса, начавшего загрузку, не роняет присоединившиеся"""
+    started = asyncio.Event()
+
+    async def slow_load():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast_load():
+        return "fresh"
+
+    flight = SingleFlight()
+    leader = asyncio.create_task(flight.do("key", slow_load))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("key", fast_load))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "fresh"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_single_flight_share_window(monkeypatch):
+    """В окне раздачи готовый результат отдается без новой загрузки"""
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return len(loads)
+
+    flight = SingleFlight(share_window=0.5)
+    assert await flight.do("key", load) == 1
+    assert await flight.do("key", load) == 1
+    now[0] += 1.0
+    assert await flight.do("key", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_question_reads_coalesced(db_session):
+    """Одновременные GET одного вопроса выполняют один запрос к БД"""
+    db_session.add(Question(text="Популярный вопрос"))
+    await db_session.commit()
+
+    repository = QuestionRepository(db_session)
+    loads = []
+    get_by_id_with_answers = repository.get_by_id_with_answers
+
+    async def counted(*args):
+        loads.append(args)
+        return await get_by_id_with_answers(*args)
+
+    repository.get_by_id_with_answers = counted
+    service = QuestionService(repository, SingleFlight())
+
+    results = await asyncio.gather(*(service.get_question_by_id(1, 20) for _ in range(10)))
+
+    assert len(loads) == 1
+    assert {result.text for result in results} == {"Популярный вопрос"}
@@ -0,0 +1,173 @@
+import asyncio
+
+import pytest
+from fastapi import status
+
+from app.core.dependencies import get_answer_write_batcher
+from app.core.write_batcher import WRITE_BATCH_SIZE, WriteBatcher
+from app.domains.answers.batcher import make_answer_write_batcher
+from app.main import app
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.mark.asyncio
+async def test_write_batcher_coalesces_concurrent_items():
+    """Элементы, пришедшие в пределах окна, записываются одной пачкой"""
+    batches = []
+
+    async def flush(items):
+        batches.append(items)
+        return [ValueError("odd") if item % 2 else item * 10 for item in items]
+
+    batcher = WriteBatcher("test", flush, max_items=100, max_delay=0.01)
+    results = await asyncio.gather(
+        *(batcher.submit(item) for item in range(6)),
+        return_exceptions=True
+    )
+
+    assert batches == [[0, 1, 2, 3, 4, 5]]
+    assert results[0::2] == [0, 20, 40]
+    assert all(isinstance(result, ValueError) for result in results[1::2])
+
+
+@pytest.mark.asyncio
+async def test_write_batcher_flushes_full_batch_without_waiting():
+    """Пачка из max_items элементов пишется сразу, не дожидаясь окна"""
+    batches = []
+
+    async def flush(items):
+        batches.append(items)
+        return items
+
+    batcher = WriteBatcher("test", flush, max_items=3, max_delay=60.0)
+    results = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(item) for item in range(3))),
+        timeout=1.0
+    )
+
+    assert results == [0, 1, 2]
+    assert batches == [[0, 1, 2]]
+
+
+@pytest.mark.asyncio
+async def test_write_batcher_flush_failure_reaches_every_item():
+    """Ошибка записи всей пачки достается каждому ожидающему запросу"""
+    async def flush(items):
+        raise RuntimeError("database is down")
+
+    batcher = WriteBatcher("test", flush, max_items=100, max_delay=0.001)
+    results = await asyncio.gather(
+        batcher.submit(1), batcher.submit(2), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_write_batcher_cancelled_waiter_error_not_reported():
+    """Ошибка пачки для отмененного запроса не логируется как необработанная"""
+    import gc
+
+    flushed = asyncio.Event()
+
+    async def flush(items):
+        flushed.set()
+        raise RuntimeError("database is down")
+
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    previous_handler = loop.get_exception_handler()
+    loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+    try:
+        batcher = WriteBatcher("test", flush, max_items=100, max_delay=0.01)
+        waiter = asyncio.ensure_future(batcher.submit(1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        # Пачка записывается и после отмены запроса
+        await asyncio.wait_for(flushed.wait(), timeout=1.0)
+        await batcher.close()
+        gc.collect()
+        await asyncio.sleep(0)
+    finally:
+        loop.set_exception_handler(previous_handler)
+
+    assert unhandled == []
+
+
+@pytest.mark.asyncio
+async def test_create_answers_with_group_commit(client):
+    """Конкурентные POST ответов проходят одной пачкой, каждый получает свой ответ"""
+    batcher = make_answer_write_batcher(TestingSessionLocal)
+    batcher.max_delay = 0.05
+    app.dependency_overrides[get_answer_write_batcher] = lambda: batcher
+
+    question = await client.post("/api/v1/questions/", json={"text": "Групповая запись"})
+    question_id = question.json()["data"]["id"]
+    count_line = 'write_batch_size_count{batcher="answers"}'
+    batches_before = sum(
+        int(line.split()[-1]) for line in WRITE_BATCH_SIZE.samples() if line.startswith(count_line)
+    )
+
+    responses = await asyncio.gather(
+        *(
+            client.post(
+                f"/api/v1/questions/{question_id}/answers/",
+                json={"text": f"Ответ {i}", "user_id": i + 1}
+            )
+            for i in range(5)
+        ),
+        client.post("/api/v1/questions/999/answers/", json={"text": "Мимо", "user_id": 1})
+    )
+
+    created = [response.json()["data"] for response in responses[:5]]
+    assert all(response.status_code == status.HTTP_201_CREATED for response in responses[:5])
+    assert [answer["text"] for answer in created] == [f"Ответ {i}" for i in range(5)]
+    assert len({answer["id"] for answer in created}) == 5
+    assert responses[5].status_code == status.HTTP_404_NOT_FOUND
+    batches_after = sum(
+        int(line.split()[-1]) for line in WRITE_BATCH_SIZE.samples() if line.startswith(count_line)
+    )
+    assert batches_after - batches_before == 1
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.json()["data"]["answer_count"] == 5
+
+
+@pytest.mark.asyncio
+async def test_create_batch_fallback_fails_only_failed_items(client, db_session, monkeypatch):
+    """Если пачка не записалась, ошибка любого типа достается только своему элементу"""
+    from app.core.cache import entity_cache
+    from app.domains.answers.repository import AnswerRepository
+    from app.domains.answers.schemas import AnswerCreateSchema
+
+    question = await client.post("/api/v1/questions/", json={"text": "Пачка с ошибкой"})
+    question_id = question.json()["data"]["id"]
+
+    insert_many = AnswerRepository.insert_many
+
+    async def failing_insert_many(self, rows):
+        if len(rows) > 1:
+            raise RuntimeError("batch insert failed")
+        if rows[0]["text"] == "Сбой":
+            raise RuntimeError("item insert failed")
+        return await insert_many(self, rows)
+
+    monkeypatch.setattr(AnswerRepository, "insert_many", failing_insert_many)
+
+    results = await AnswerRepository(db_session, entity_cache).create_batch([
+        (question_id, AnswerCreateSchema(text="Первый", user_id=1)),
+        (question_id, AnswerCreateSchema(text="Сбой", user_id=2)),
+        (999, AnswerCreateSchema(text="Мимо", user_id=3)),
+        (question_id, AnswerCreateSchema(text="Последний", user_id=4)),
+    ])
+
+    assert results[0].text == "Первый"
+    assert isinstance(results[1], RuntimeError)
+    assert isinstance(results[2], ValueError)
+    assert results[3].text == "Последний"
+
+    response = await client.get(f"/api/v1/questions/{question_id}")
+    assert response.json()["data"]["answer_count"] == 2